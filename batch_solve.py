@@ -0,0 +1,132 @@
+"""Headless batch solver.
+
+Solves every maze in an input directory with one or more algorithms and
+writes the usual ``mazes_output_csv/<algo>/<algo>_N.csv`` files (plus a
+``<algo>_N.png`` image beside each with ``--png``).  Mazes are
+spread over a process pool sized to the machine, and nothing here imports
+pygame or reportlab.  Each result carries the solve's metrics (see
+solve_metrics.py); ``--metrics-log`` appends them to a JSON-lines file.
+
+Example:
+    python batch_solve.py --algorithm aStar --algorithm bfs --metrics-log solves.jsonl
+"""
+import argparse
+import os
+
+import solver_core
+from maze_export import write_grid_to_png
+from maze_io import list_maze_inputs, maze_index, read_costs, read_grid, write_grid_to_csv
+from solve_metrics import METRICS_LOG_ENV, SolveMetrics, append_json_line, profile_modes
+
+BASE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def explored_marker(grid):
+    """An ``on_expand`` callback that marks each expanded cell explored (5) in ``grid`` itself.
+
+    ``grid`` must be a contiguous uint8 array, as ``read_grid`` returns.  The
+    solvers only tell walls from open cells, so marking during the search
+    leaves it unchanged, and nothing is kept per cell beyond the grid byte.
+    """
+    cells = memoryview(grid.reshape(-1))
+    cols = grid.shape[1]
+
+    def on_expand(cell):
+        cells[cell[0] * cols + cell[1]] = solver_core.EXPLORED
+
+    return on_expand
+
+
+def mark_solution(grid, path):
+    """Mark the final path (4) over cells ``explored_marker`` marked, as the visualizers do."""
+    rows, cols = zip(*path)
+    grid[list(rows), list(cols)] = solver_core.FINAL_PATH
+    return grid
+
+
+def solve_maze_file(input_file, algorithm, csv_output_directory, png=False):
+    """Solve one maze file; returns ``(input_file, output_file or None, stats)``.
+
+    ``stats`` is the solver's stats plus the timings and peak memory of
+    ``SolveMetrics.as_dict()``, or an ``"error"`` entry if the solver or the
+    maze's terrain layer was rejected.
+    """
+    metrics = SolveMetrics(algorithm, input_file)
+    if "memory" in profile_modes():
+        metrics.start_memory_trace()  # left running in the worker; the peak is reset per solve
+    with metrics.phase("io"):
+        grid = read_grid(input_file)
+    try:
+        with metrics.phase("io"):
+            costs = read_costs(input_file, grid.shape) if algorithm in solver_core.WEIGHTED_SOLVERS else None
+        with metrics.phase("search"):
+            path, _ = metrics.record(solver_core.solve(grid, algorithm, on_expand=explored_marker(grid), costs=costs))
+    except ValueError as error:
+        return input_file, None, {"algorithm": algorithm, "maze": input_file, "error": str(error)}
+    csv_file = None
+    if path:
+        mark_solution(grid, path)
+        csv_file = os.path.join(csv_output_directory, f"{algorithm}_{maze_index(input_file)}.csv")
+        with metrics.phase("io"):
+            write_grid_to_csv(csv_file, grid)
+            if png:
+                write_grid_to_png(os.path.splitext(csv_file)[0] + ".png", grid)
+    metrics.record_peak_memory()
+    return input_file, csv_file, metrics.as_dict()
+
+
+def _solve_job(job):
+    return solve_maze_file(*job)
+
+
+def solve_all(input_files, algorithms, output_root, workers=None, png=False):
+    """Solve ``input_files`` with each algorithm in parallel; yields per-maze results."""
+    jobs = []
+    for algorithm in algorithms:
+        csv_output_directory = os.path.join(output_root, algorithm)
+        os.makedirs(csv_output_directory, exist_ok=True)
+        jobs.extend((input_file, algorithm, csv_output_directory, png) for input_file in input_files)
+
+    from concurrent.futures import ProcessPoolExecutor  # keeps `import batch_solve` cheap for single solves
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_solve_job, jobs, chunksize=chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve every maze in a directory without a display.")
+    parser.add_argument("--algorithm", action="append", choices=sorted(solver_core.SOLVERS),
+                        help="solver to run (repeatable, default: bfs, dfs and aStar)")
+    parser.add_argument("--input", default=os.path.join(BASE_DIRECTORY, "mazes_input"),
+                        help="directory containing the maze CSV files")
+    parser.add_argument("--pattern", default="maze_*.csv", help="glob for maze files inside --input (.csv or .maze)")
+    parser.add_argument("--output", default=os.path.join(BASE_DIRECTORY, "mazes_output_csv"),
+                        help="root directory for <algo>/<algo>_N.csv outputs")
+    parser.add_argument("--png", action="store_true", help="also write <algo>_N.png images of the solved mazes")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--metrics-log", default=os.environ.get(METRICS_LOG_ENV),
+                        help=f"append each solve's metrics to this JSON-lines file (default: ${METRICS_LOG_ENV})")
+    args = parser.parse_args(argv)
+
+    input_files = list_maze_inputs(args.input, args.pattern)
+    if not input_files:
+        print(f"No mazes matching {args.pattern} in {args.input}")
+        return 1
+
+    algorithms = args.algorithm or ["bfs", "dfs", "aStar"]
+    failures = 0
+    for input_file, csv_file, stats in solve_all(input_files, algorithms, args.output, args.workers, args.png):
+        if args.metrics_log:
+            append_json_line(args.metrics_log, stats)
+        if csv_file:
+            print(f"{input_file} -> {csv_file} (expanded {stats['nodes_expanded']}, path {stats['path_length']})")
+        else:
+            failures += 1
+            print(f"{input_file}: {stats.get('error', 'No path found.')}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
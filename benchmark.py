@@ -0,0 +1,196 @@
+"""Benchmark the headless solvers across maze sizes and redundancy densities.
+
+Mazes are built with ``generate_maze()`` and ``add_redundant_paths()`` from
+maze_generator.py (or, with ``--generator kruskal`` or ``sidewinder``, a
+vectorised generator and ``add_redundant_paths_fast()``, the practical
+choice for mazes of several thousand cells per side), with the start in the
+top-left corner and the goal in the bottom-right one.  Sidewinder's open
+top row favours some solvers (bidirectional search in particular), so
+compare solvers on backtracker or kruskal mazes.
+
+Each solver is timed on its own run; peak memory is measured on a separate
+run under tracemalloc so the tracing overhead does not distort the timings.
+
+``--startup`` instead times how long a fresh interpreter takes to import
+each solver entry point, on top of importing NumPy, and checks it against
+``STARTUP_TARGET_MS``; headless runs must not load pygame or reportlab.
+
+Example:
+    python benchmark.py --size 35 --size 201 --density 0 --density 0.15 --json results.json
+    python benchmark.py --startup
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import solver_core
+from maze_generator import FAST_GENERATORS, add_redundant_paths, add_redundant_paths_fast, generate_maze
+
+GENERATORS = ("backtracker",) + tuple(FAST_GENERATORS)
+
+STARTUP_MODULES = ("bfs", "dfs", "aStar", "batch_solve")
+STARTUP_TARGET_MS = 50  # import cost of an entry point beyond ``import numpy``
+HEAVY_MODULES = ("pygame", "reportlab")
+
+
+def make_maze(size, density, seed, generator="backtracker"):
+    """A ``size`` x ``size`` maze (size rounded up to odd) with start (2) and goal (3) set."""
+    size += 1 - size % 2  # the 2-cell carving lattice needs odd dimensions to reach the far corner
+    if generator in FAST_GENERATORS:
+        rng = np.random.default_rng(seed)
+        grid = FAST_GENERATORS[generator]((size, size), rng=rng)
+        if density:
+            add_redundant_paths_fast(grid, density, rng=rng)
+    else:
+        random.seed(seed)
+        grid = np.zeros((size, size), dtype=np.uint8)
+        generate_maze(grid, (0, 0), (size, size))
+        if density:
+            add_redundant_paths(grid, (size, size), density=density)
+    grid[0, 0] = solver_core.START
+    grid[size - 1, size - 1] = solver_core.GOAL
+    return grid
+
+
+def measure(grid, algorithm, repeat=1, track_memory=True):
+    """Best-of-``repeat`` wall time plus solver stats and (optionally) peak traced memory."""
+    start, goal = solver_core.find_start_goal(grid)
+    solver = solver_core.SOLVERS[algorithm]
+    best = None
+    for _ in range(repeat):
+        began = time.perf_counter()
+        path, stats = solver(grid, start, goal)
+        elapsed = time.perf_counter() - began
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak_bytes = None
+    if track_memory:
+        tracemalloc.start()
+        solver(grid, start, goal)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "algorithm": algorithm,
+        "seconds": best,
+        "nodes_expanded": stats["nodes_expanded"],
+        "path_length": stats["path_length"] if path else None,
+        "peak_bytes": peak_bytes,
+    }
+
+
+def run_benchmark(sizes, densities, algorithms, repeat=1, seed=0, track_memory=True, generator="backtracker"):
+    results = []
+    for size in sizes:
+        for density in densities:
+            grid = make_maze(size, density, seed, generator)
+            for algorithm in algorithms:
+                row = measure(grid, algorithm, repeat, track_memory)
+                row.update(size=grid.shape[0], density=density)
+                results.append(row)
+    return results
+
+
+def _import_seconds(module):
+    """Wall time of a fresh ``python -c 'import module'`` and the heavy modules it pulled in."""
+    code = f"import {module}, sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    began = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    return time.perf_counter() - began, [name for name in result.stdout.strip().split(",") if name]
+
+
+def measure_startup(modules=STARTUP_MODULES, repeat=5):
+    """Median import time per module in milliseconds, with the NumPy baseline subtracted."""
+    baseline = statistics.median(_import_seconds("numpy")[0] for _ in range(repeat))
+    results = []
+    for module in modules:
+        runs = [_import_seconds(module) for _ in range(repeat)]
+        overhead_ms = (statistics.median(seconds for seconds, _ in runs) - baseline) * 1000
+        heavy = runs[0][1]
+        results.append({
+            "module": module,
+            "baseline_ms": baseline * 1000,
+            "overhead_ms": overhead_ms,
+            "heavy_imports": heavy,
+            "ok": overhead_ms <= STARTUP_TARGET_MS and not heavy,
+        })
+    return results
+
+
+def format_startup_table(results):
+    header = f"{'module':<14} {'numpy ms':>9} {'extra ms':>9} {'target':>7}  heavy imports"
+    lines = [header, "-" * len(header)]
+    for row in results:
+        lines.append(
+            f"{row['module']:<14} {row['baseline_ms']:>9.1f} {row['overhead_ms']:>9.1f} "
+            f"{'ok' if row['ok'] else 'MISS':>7}  {', '.join(row['heavy_imports']) or '-'}"
+        )
+    return "\n".join(lines)
+
+
+def format_table(results):
+    header = f"{'size':>6} {'density':>7} {'algorithm':<20} {'seconds':>10} {'expanded':>10} {'path':>8} {'peak KiB':>10}"
+    lines = [header, "-" * len(header)]
+    for row in results:
+        peak = "-" if row["peak_bytes"] is None else f"{row['peak_bytes'] / 1024:.0f}"
+        path = "-" if row["path_length"] is None else row["path_length"]
+        lines.append(
+            f"{row['size']:>6} {row['density']:>7} {row['algorithm']:<20} {row['seconds']:>10.4f} "
+            f"{row['nodes_expanded']:>10} {path:>8} {peak:>10}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark BFS, DFS and A* on generated mazes.")
+    parser.add_argument("--size", type=int, action="append", help="maze side length (repeatable, default: 35 101 301)")
+    parser.add_argument("--density", type=float, action="append",
+                        help="add_redundant_paths density (repeatable, default: 0 0.15)")
+    parser.add_argument("--algorithm", action="append", choices=sorted(solver_core.SOLVERS),
+                        help="solver to benchmark (repeatable, default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case, best is reported")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for maze generation")
+    parser.add_argument("--generator", choices=GENERATORS, default="backtracker",
+                        help="maze generator (kruskal and sidewinder are the fast vectorised ones)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON to FILE ('-' for stdout)")
+    parser.add_argument("--startup", action="store_true",
+                        help=f"measure entry-point import time instead (target: {STARTUP_TARGET_MS} ms over numpy)")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        results = measure_startup(repeat=args.repeat + 2)
+        print(format_startup_table(results))
+        if not all(row["ok"] for row in results):
+            raise SystemExit(1)
+        return
+
+    results = run_benchmark(
+        args.size or [35, 101, 301],
+        args.density or [0.0, 0.15],
+        args.algorithm or list(solver_core.SOLVERS),
+        repeat=args.repeat,
+        seed=args.seed,
+        track_memory=not args.no_memory,
+        generator=args.generator,
+    )
+    if args.json == "-":
+        print(json.dumps(results, indent=2))
+        return
+    print(format_table(results))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,10 @@
-import csv
-import pygame
-import time
 import glob
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-
-def read_grid_from_csv(file_path):
-    with open(file_path, mode='r') as file:
-        reader = csv.reader(file)
-        return [list(map(int, row)) for row in reader]
-
-def write_grid_to_csv(file_path, grid):
-    with open(file_path, mode='w', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerows(grid)
-
-def write_grid_to_pdf(file_path, grid):
-    """Generate a PDF representation of the solved maze."""
-    cell_size = 10
-    margin = 5
-    width = len(grid[0]) * cell_size + 2 * margin
-    height = len(grid) * cell_size + 2 * margin
-
-    c = canvas.Canvas(file_path, pagesize=(width, height))
-    
-    colors = {
-        0: (0, 0, 0),  # Wall (Black)
-        1: (255, 255, 255),  # Path (White)
-        2: (0, 255, 0),  # Start (Green)
-        3: (255, 0, 0),  # Goal (Red)
-        4: (0, 0, 255),  # Final Path (Deep Blue)
-        5: (173, 216, 230)  # Explored Path (Light Blue)
-    }
-
-    for row in range(len(grid)):
-        for col in range(len(grid[0])):
-            color = colors.get(grid[row][col], (0, 0, 0))
-            c.setFillColorRGB(color[0] / 255, color[1] / 255, color[2] / 255)
-            c.rect(margin + col * cell_size, height - (margin + (row + 1) * cell_size), cell_size, cell_size, fill=1)
-
-    c.save()
+import os
+import sys
+import solver_core
+from solve_metrics import SolveMetrics, instrument
+from maze_io import read_grid_from_csv, write_grid_to_csv
+from maze_export import write_grid_to_pdf, write_grid_to_png  # reportlab is imported only when a PDF is written
 
 def get_corresponding_dfs_files(input_directory, csv_output_directory, pdf_output_directory):
     maze_file = get_next_maze_input(input_directory)
@@ -56,136 +21,88 @@ def get_next_maze_input(directory):
     next_index = max(indices)
     return f"{directory}/maze_{next_index}.csv"
 
-def bfs(grid, start, goal, screen, CELL_SIZE, MARGIN, quit_button_rect):
-    from collections import deque
-    rows, cols = len(grid), len(grid[0])
-    directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-    queue = deque([start])
-    visited = set()
-    came_from = {start: None}
-    
-    while queue:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                exit()
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if quit_button_rect.collidepoint(event.pos):
-                    pygame.quit()
-                    exit()
+def bfs(grid, start, goal, screen, CELL_SIZE, MARGIN, quit_button_rect, metrics=None):
+    from maze_view import make_scheduler  # pygame is only loaded for visual runs
+    metrics = metrics or SolveMetrics("bfs")
+    scheduler = make_scheduler(grid, screen, CELL_SIZE, MARGIN, quit_button_rect, quit_button_rect)
 
-        current = queue.popleft()
-        
-        if current == goal:
-            path = []
-            while current:
-                path.append(current)
-                current = came_from[current]
-            return path[::-1]
-        
-        if current not in visited:
-            visited.add(current)
-            grid[current[0]][current[1]] = 5
-            display_maze(grid, screen, CELL_SIZE, MARGIN, quit_button_rect)
-            
-            for dx, dy in directions:
-                neighbor = (current[0] + dx, current[1] + dy)
-                if 0 <= neighbor[0] < rows and 0 <= neighbor[1] < cols and grid[neighbor[0]][neighbor[1]] != 0:
-                    if neighbor not in visited:
-                        came_from[neighbor] = current
-                        queue.append(neighbor)
-    
-    return None
+    def on_expand(cell):
+        # Visualize visited nodes
+        if cell != start and cell != goal:
+            grid[cell[0]][cell[1]] = 5
+            scheduler.step([cell])
+
+    with metrics.phase("search"):
+        path, _ = metrics.record(solver_core.bfs(grid, start, goal, on_expand=metrics.timed(on_expand)))
+    with metrics.phase("render"):
+        scheduler.finish()
+    return path
 
 def mark_path_in_grid(grid, path, screen, CELL_SIZE, MARGIN, quit_button_rect):
+    from maze_view import make_scheduler
+    scheduler = make_scheduler(grid, screen, CELL_SIZE, MARGIN, quit_button_rect, quit_button_rect)
     for x, y in path:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                exit()
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if quit_button_rect.collidepoint(event.pos):
-                    pygame.quit()
-                    exit()
-        
-        grid[x][y] = 4
-        display_maze(grid, screen, CELL_SIZE, MARGIN, quit_button_rect)
+        grid[x][y] = 4  # Mark path (deep blue)
+        scheduler.step([(x, y)])
+    scheduler.finish()
     return grid
 
-def display_maze(grid, screen, CELL_SIZE, MARGIN, quit_button_rect):
-    BLACK = (0, 0, 0)
-    WHITE = (255, 255, 255)
-    GREEN = (0, 255, 0)
-    RED = (255, 0, 0)
-    LIGHT_BLUE = (173, 216, 230)
-    DEEP_BLUE = (0, 0, 255)
-    rows, cols = len(grid), len(grid[0])
-    screen.fill(WHITE)
-    
-    for row in range(rows):
-        for col in range(cols):
-            color = BLACK
-            if grid[row][col] == 1:
-                color = WHITE
-            elif grid[row][col] == 2:
-                color = GREEN
-            elif grid[row][col] == 3:
-                color = RED
-            elif grid[row][col] == 4:
-                color = DEEP_BLUE
-            elif grid[row][col] == 5:
-                color = LIGHT_BLUE
-            pygame.draw.rect(
-                screen,
-                color,
-                [
-                    col * (CELL_SIZE + MARGIN),
-                    row * (CELL_SIZE + MARGIN),
-                    CELL_SIZE,
-                    CELL_SIZE,
-                ],
-            )
-    pygame.draw.rect(screen, (200, 0, 0), quit_button_rect)
-    font = pygame.font.Font(None, 24)
-    text = font.render("QUIT", True, WHITE)
-    text_rect = text.get_rect(center=quit_button_rect.center)
-    screen.blit(text, text_rect)
-    pygame.display.flip()
+def save_result(grid, path, input_directory, csv_output_directory, pdf_output_directory, metrics=None, png=False):
+    metrics = metrics or SolveMetrics("bfs")
+    if path:
+        csv_file, pdf_file = get_corresponding_dfs_files(input_directory, csv_output_directory, pdf_output_directory)
+        with metrics.phase("io"):
+            write_grid_to_csv(csv_file, grid)
+        with metrics.phase("pdf"):
+            write_grid_to_pdf(pdf_file, grid)
+        print(f"Path saved to:\nCSV: {csv_file}\nPDF: {pdf_file}")
+        if png:
+            png_file = os.path.splitext(pdf_file)[0] + ".png"  # next to the PDF
+            with metrics.phase("io"):
+                write_grid_to_png(png_file, grid)
+            print(f"PNG: {png_file}")
+    else:
+        print("No path found.")
 
-def main(input_directory, csv_output_directory, pdf_output_directory):
+def main(input_directory, csv_output_directory, pdf_output_directory, headless=False, png=False):
     input_file = get_next_maze_input(input_directory)
-    grid = read_grid_from_csv(input_file)
-    start, goal = None, None
+    with instrument("bfs", input_file) as metrics:
+        with metrics.phase("io"):
+            grid = read_grid_from_csv(input_file)
+        start, goal = solver_core.find_start_goal(grid)
     
-    for r in range(len(grid)):
-        for c in range(len(grid[0])):
-            if grid[r][c] == 2:
-                start = (r, c)
-            if grid[r][c] == 3:
-                goal = (r, c)
+        if not start or not goal:
+            print("Start or goal not found in the grid!")
+            return metrics
     
-    if not start or not goal:
-        print("Start or goal not found in the grid!")
-        return
+        if headless:
+            # Same outputs without a window; pygame is never imported
+            from batch_solve import explored_marker, mark_solution
+            with metrics.phase("search"):
+                path, _ = metrics.record(solver_core.bfs(grid, start, goal, on_expand=explored_marker(grid)))
+            if path:
+                mark_solution(grid, path)
+            save_result(grid, path, input_directory, csv_output_directory, pdf_output_directory, metrics, png)
+            print(metrics.summary())
+            return metrics
     
-    pygame.init()
-    CELL_SIZE, MARGIN = 15, 2
-    screen_width = (CELL_SIZE + MARGIN) * len(grid[0])
-    screen_height = (CELL_SIZE + MARGIN) * len(grid) + 50
-    screen = pygame.display.set_mode((screen_width, screen_height))
-    pygame.display.set_caption("BFS Pathfinding Visualization")
-    quit_button_rect = pygame.Rect(screen_width // 2 - 50, screen_height - 40, 100, 30)
+        import pygame
+        embedded = pygame.display.get_init()  # launched from main.py, which owns the window
+        pygame.init()
+        CELL_SIZE, MARGIN = 15, 2
+        screen_width = (CELL_SIZE + MARGIN) * len(grid[0])
+        screen_height = (CELL_SIZE + MARGIN) * len(grid) + 50
+        screen = pygame.display.set_mode((screen_width, screen_height))
+        pygame.display.set_caption("BFS Pathfinding Visualization")
+        quit_button_rect = pygame.Rect(screen_width // 2 - 50, screen_height - 40, 100, 30)
     
-    path = bfs(grid, start, goal, screen, CELL_SIZE, MARGIN, quit_button_rect) 
+        path = bfs(grid, start, goal, screen, CELL_SIZE, MARGIN, quit_button_rect, metrics)
     
-    if path:
-        mark_path_in_grid(grid, path, screen, CELL_SIZE, MARGIN, quit_button_rect)
-        csv_file, pdf_file = get_corresponding_dfs_files(input_directory, csv_output_directory, pdf_output_directory)
-        write_grid_to_csv(csv_file, grid)
-        write_grid_to_pdf(pdf_file, grid)
-        print(f"Path saved to:\nCSV: {csv_file}\nPDF: {pdf_file}")
-    else:
-        print("No path found.")
+        if path:
+            with metrics.phase("render"):
+                mark_path_in_grid(grid, path, screen, CELL_SIZE, MARGIN, quit_button_rect)
+        save_result(grid, path, input_directory, csv_output_directory, pdf_output_directory, metrics, png)
+        print(metrics.summary())
     
     running = True
     while running:
@@ -194,10 +111,18 @@ def main(input_directory, csv_output_directory, pdf_output_directory):
                 running = False
             if event.type == pygame.MOUSEBUTTONDOWN and quit_button_rect.collidepoint(event.pos):
                 running = False
-    pygame.quit()
+    if not embedded:
+        pygame.quit()
+    return metrics
 
-if __name__ == "__main__":
+# Entry point used by both the command line and main.py
+def run():
     input_directory = r"AI_Maze_Solver\mazes_input"
     csv_output_directory = r"AI_Maze_Solver\mazes_output_csv\bfs"
     pdf_output_directory = r"AI_Maze_Solver\mazes_output_pdf\bfs"
-    main(input_directory, csv_output_directory, pdf_output_directory)
+    headless = "--headless" in sys.argv  # solve and save without opening a window
+    png = "--png" in sys.argv  # also save the solved maze as a PNG image
+    main(input_directory, csv_output_directory, pdf_output_directory, headless, png)
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,345 @@
+"""Corridor-contracted junction graph for repeated queries on one maze.
+
+Mazes from ``generate_maze()`` are mostly one-cell corridors.  This index
+turns every open cell that is not a plain corridor cell (dead ends,
+junctions, isolated cells) into a node and every corridor between two nodes
+into one weighted edge.  Each corridor cell remembers its edge and its
+offset along it, so queries can start and end anywhere.
+
+Dead ends are then peeled off repeatedly: what remains (the "core") is the
+part of the maze that contains cycles, and each pruned node keeps the edge
+leading back towards the core.  A query climbs from its endpoints to the
+core, runs A* on the core graph only, and expands the edges it used back
+into grid cells.  In a perfect maze the core is empty and a query is just
+two climbs to their common ancestor.
+
+Built indexes are cached next to the maze file (``<maze>.corridors.npz``)
+and rebuilt when the maze file changes.  maze_server.py answers
+``"algorithm": "corridor"`` queries from this index.
+"""
+import heapq
+
+import numpy as np
+
+import solver_core
+from maze_io import load_cached_index, load_index, save_index
+
+CACHE_SUFFIX = ".corridors.npz"
+
+
+class CorridorGraph:
+    def __init__(self, grid):
+        self.grid = solver_core.as_grid(grid)
+        self.rows, self.cols = self.grid.shape
+        self._build()
+        self._prune_dead_ends()
+        self._build_core_adjacency()
+
+    # Construction
+
+    def _build(self):
+        grid, cols = self.grid, self.cols
+        size = grid.size
+        open_cells = grid != solver_core.WALL
+        degree = np.zeros(grid.shape, dtype=np.int8)
+        degree[:, :-1] += open_cells[:, 1:]
+        degree[:, 1:] += open_cells[:, :-1]
+        degree[:-1, :] += open_cells[1:, :]
+        degree[1:, :] += open_cells[:-1, :]
+        degree *= open_cells
+
+        cells = memoryview(grid.reshape(-1))
+        node_cells = np.flatnonzero((open_cells & (degree != 2)).reshape(-1)).tolist()
+        node_id = np.full(size, -1, dtype=np.int32)
+        node_id[node_cells] = np.arange(len(node_cells), dtype=np.int32)
+        cell_edge = np.full(size, -1, dtype=np.int32)
+        cell_offset = np.zeros(size, dtype=np.int32)
+        node_view, edge_view, offset_view = memoryview(node_id), memoryview(cell_edge), memoryview(cell_offset)
+        edge_u, edge_v, edge_length, edge_first = [], [], [], []
+
+        def trace_from(node_cell):
+            for first in solver_core.open_neighbors(cells, node_cell, cols, size):
+                if node_view[first] != -1:
+                    # Directly adjacent nodes: record the edge once
+                    if node_cell < first:
+                        edge_u.append(node_view[node_cell])
+                        edge_v.append(node_view[first])
+                        edge_length.append(1)
+                        edge_first.append(first)
+                    continue
+                if edge_view[first] != -1:
+                    continue  # corridor already traced from its other end
+                edge = len(edge_u)
+                previous, current, offset = node_cell, first, 1
+                while node_view[current] == -1:
+                    edge_view[current] = edge
+                    offset_view[current] = offset
+                    a, b = solver_core.open_neighbors(cells, current, cols, size)
+                    previous, current = current, (b if a == previous else a)
+                    offset += 1
+                edge_u.append(node_view[node_cell])
+                edge_v.append(node_view[current])
+                edge_length.append(offset)
+                edge_first.append(first)
+
+        for node_cell in node_cells:
+            trace_from(node_cell)
+
+        # Cycles made only of corridor cells get one of their cells as a node
+        corridor = (open_cells & (degree == 2)).reshape(-1)
+        for cell in np.flatnonzero(corridor & (cell_edge == -1)).tolist():
+            if edge_view[cell] == -1 and node_view[cell] == -1:
+                node_view[cell] = len(node_cells)
+                node_cells.append(cell)
+                trace_from(cell)
+
+        self.node_cells = np.array(node_cells, dtype=np.int64)
+        self.node_id = node_id
+        self.cell_edge = cell_edge
+        self.cell_offset = cell_offset
+        self.edge_u = np.array(edge_u, dtype=np.int32)
+        self.edge_v = np.array(edge_v, dtype=np.int32)
+        self.edge_length = np.array(edge_length, dtype=np.int32)
+        self.edge_first = np.array(edge_first, dtype=np.int64)
+
+    def _incident_edges(self, edge_mask=None):
+        """CSR adjacency (indptr, edge ids) over the edges selected by ``edge_mask``."""
+        edges = np.arange(len(self.edge_u)) if edge_mask is None else np.flatnonzero(edge_mask)
+        ends = np.concatenate((self.edge_u[edges], self.edge_v[edges]))
+        both = np.concatenate((edges, edges))
+        order = np.argsort(ends, kind="stable")
+        indptr = np.zeros(len(self.node_cells) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ends, minlength=len(self.node_cells)), out=indptr[1:])
+        return indptr, both[order]
+
+    def _prune_dead_ends(self):
+        node_count = len(self.node_cells)
+        indptr, incident = self._incident_edges()
+        indptr, incident = indptr.tolist(), incident.tolist()
+        edge_u, edge_v = self.edge_u.tolist(), self.edge_v.tolist()
+        degree = np.diff(np.array(indptr)).tolist()  # a self-loop counts twice, as it should
+        removed = [False] * len(edge_u)
+        up_edge = [-1] * node_count
+        pruned = [False] * node_count
+
+        leaves = [node for node in range(node_count) if degree[node] == 1]
+        while leaves:
+            node = leaves.pop()
+            if pruned[node] or degree[node] != 1:
+                continue
+            edge = next(e for e in incident[indptr[node]:indptr[node + 1]] if not removed[e])
+            removed[edge] = True
+            pruned[node] = True
+            up_edge[node] = edge
+            degree[node] = 0
+            other = edge_u[edge] + edge_v[edge] - node
+            degree[other] -= 1
+            if degree[other] == 1:
+                leaves.append(other)
+
+        self.edge_removed = np.array(removed, dtype=bool)
+        self.up_edge = np.array(up_edge, dtype=np.int32)
+        self.pruned = np.array(pruned, dtype=bool)
+
+    def _build_core_adjacency(self):
+        self.core_indptr, self.core_edges = self._incident_edges(~self.edge_removed)
+
+    # Caching
+
+    ARRAYS = ("node_cells", "node_id", "cell_edge", "cell_offset", "edge_u", "edge_v",
+              "edge_length", "edge_first", "edge_removed", "up_edge", "pruned")
+
+    def save(self, file_path, source_signature=None):
+        save_index(file_path, {name: getattr(self, name) for name in self.ARRAYS}, source_signature)
+
+    @classmethod
+    def load(cls, file_path, grid, source_signature=None):
+        """Load a saved index for ``grid``; returns None if it is stale or unreadable."""
+        data = load_index(file_path, source_signature)
+        if data is None or any(name not in data for name in cls.ARRAYS):
+            return None
+        graph = cls.__new__(cls)
+        graph.grid = solver_core.as_grid(grid)
+        graph.rows, graph.cols = graph.grid.shape
+        for name in cls.ARRAYS:
+            setattr(graph, name, data[name])
+        if graph.node_id.shape[0] != graph.grid.size:
+            return None
+        graph._build_core_adjacency()
+        return graph
+
+    # Queries
+
+    def edge_cells(self, edge):
+        """Flat indices along ``edge`` from its u node to its v node."""
+        cells = memoryview(self.grid.reshape(-1))
+        size = self.grid.size
+        length = int(self.edge_length[edge])
+        previous = int(self.node_cells[self.edge_u[edge]])
+        current = int(self.edge_first[edge])
+        out = [previous]
+        for step in range(1, length + 1):
+            out.append(current)
+            if step < length:
+                a, b = solver_core.open_neighbors(cells, current, self.cols, size)
+                previous, current = current, (b if a == previous else a)
+        return out
+
+    def _node_offset(self, edge, node):
+        return 0 if self.edge_u[edge] == node else int(self.edge_length[edge])
+
+    def _climb(self, node, cost, pieces):
+        """Follow pruned nodes up to the core; returns [(node, cost, pieces)] for every node passed."""
+        chain = [(node, cost, pieces)]
+        while self.pruned[node]:
+            edge = int(self.up_edge[node])
+            other = int(self.edge_u[edge] + self.edge_v[edge] - node)
+            pieces = pieces + [(edge, self._node_offset(edge, node), self._node_offset(edge, other))]
+            cost += int(self.edge_length[edge])
+            node = other
+            chain.append((node, cost, pieces))
+        return chain
+
+    def _endpoint_chains(self, cell):
+        index = cell[0] * self.cols + cell[1]
+        node = int(self.node_id[index])
+        if node != -1:
+            return [self._climb(node, 0, [])]
+        edge = int(self.cell_edge[index])
+        if edge == -1:
+            raise ValueError(f"{cell} is not an open cell")
+        offset = int(self.cell_offset[index])
+        length = int(self.edge_length[edge])
+        return [
+            self._climb(int(self.edge_u[edge]), offset, [(edge, offset, 0)]),
+            self._climb(int(self.edge_v[edge]), length - offset, [(edge, offset, length)]),
+        ]
+
+    def shortest_path(self, start, goal, on_expand=None):
+        """Shortest path between two open cells as a list of (row, col), plus stats.
+
+        ``on_expand`` is called with the cell of each core node the search
+        expands; climbs and corridor walks are not searches and report nothing.
+        """
+        stats = {"nodes_expanded": 0, "path_length": 0}
+        start_chains = self._endpoint_chains(start)
+        goal_chains = self._endpoint_chains(goal)
+        best_cost, best_pieces = None, None
+
+        def consider(cost, pieces):
+            nonlocal best_cost, best_pieces
+            if best_cost is None or cost < best_cost:
+                best_cost, best_pieces = cost, pieces
+
+        # Both endpoints on the same corridor
+        start_index, goal_index = start[0] * self.cols + start[1], goal[0] * self.cols + goal[1]
+        if start_index == goal_index:
+            consider(0, [])
+        elif self.cell_edge[start_index] != -1 and self.cell_edge[start_index] == self.cell_edge[goal_index]:
+            edge = int(self.cell_edge[start_index])
+            a, b = int(self.cell_offset[start_index]), int(self.cell_offset[goal_index])
+            consider(abs(a - b), [(edge, a, b)])
+
+        # Both endpoints hang off the same pruned tree: meet at the first shared node
+        goal_reach = {}
+        for chain in goal_chains:
+            for node, cost, pieces in chain:
+                if node not in goal_reach or cost < goal_reach[node][0]:
+                    goal_reach[node] = (cost, pieces)
+        for chain in start_chains:
+            for node, cost, pieces in chain:
+                if node in goal_reach:
+                    goal_cost, goal_pieces = goal_reach[node]
+                    consider(cost + goal_cost, pieces + _reverse_pieces(goal_pieces))
+
+        # Otherwise search the core graph between the chains' core ends
+        goal_row, goal_col = goal
+        targets = {}
+        for chain in goal_chains:
+            node, cost, pieces = chain[-1]
+            if not self.pruned[node] and (node not in targets or cost < targets[node][0]):
+                targets[node] = (cost, pieces)
+        best_g, came_from, open_list = {}, {}, []
+        for chain in start_chains:
+            node, cost, pieces = chain[-1]
+            if not self.pruned[node] and (node not in best_g or cost < best_g[node]):
+                best_g[node] = cost
+                came_from[node] = (None, None, pieces)
+                heapq.heappush(open_list, (cost + self._h(node, goal_row, goal_col), -cost, node))
+
+        core_indptr, core_edges = self.core_indptr, self.core_edges
+        while open_list and targets:
+            f_score, negative_g, node = heapq.heappop(open_list)
+            if best_cost is not None and f_score >= best_cost:
+                break
+            g = -negative_g
+            if g != best_g[node]:
+                continue
+            stats["nodes_expanded"] += 1
+            if on_expand is not None:
+                on_expand(divmod(int(self.node_cells[node]), self.cols))
+            if node in targets:
+                consider(g + targets[node][0], self._core_pieces(came_from, node) + _reverse_pieces(targets[node][1]))
+            for edge in core_edges[core_indptr[node]:core_indptr[node + 1]].tolist():
+                other = int(self.edge_u[edge] + self.edge_v[edge] - node)
+                tentative = g + int(self.edge_length[edge])
+                if other not in best_g or tentative < best_g[other]:
+                    best_g[other] = tentative
+                    came_from[other] = (node, edge, None)
+                    heapq.heappush(open_list, (tentative + self._h(other, goal_row, goal_col), -tentative, other))
+
+        if best_cost is None:
+            return None, stats
+        path = self._expand(best_pieces, start)
+        stats["path_length"] = len(path)
+        return path, stats
+
+    def _h(self, node, goal_row, goal_col):
+        row, col = divmod(int(self.node_cells[node]), self.cols)
+        return abs(row - goal_row) + abs(col - goal_col)
+
+    def _core_pieces(self, came_from, node):
+        pieces = []
+        while True:
+            previous, edge, start_pieces = came_from[node]
+            if previous is None:
+                return start_pieces + pieces[::-1]
+            pieces.append((edge, self._node_offset(edge, previous), self._node_offset(edge, node)))
+            node = previous
+
+    def _expand(self, pieces, start):
+        path = [start[0] * self.cols + start[1]]
+        traced = {}
+        for edge, from_offset, to_offset in pieces:
+            if edge not in traced:
+                traced[edge] = self.edge_cells(edge)
+            cells = traced[edge]
+            if from_offset <= to_offset:
+                segment = cells[from_offset:to_offset + 1]
+            else:
+                segment = cells[to_offset:from_offset + 1][::-1]
+            path.extend(segment[1:])
+        return [divmod(cell, self.cols) for cell in path]
+
+    def summary(self):
+        return {
+            "open_cells": int(np.count_nonzero(self.grid != solver_core.WALL)),
+            "nodes": len(self.node_cells),
+            "edges": len(self.edge_u),
+            "core_nodes": int(np.count_nonzero(~self.pruned)),
+            "core_edges": int(np.count_nonzero(~self.edge_removed)),
+        }
+
+
+def _reverse_pieces(pieces):
+    return [(edge, to_offset, from_offset) for edge, from_offset, to_offset in reversed(pieces)]
+
+
+def load_corridor_graph(maze_path, grid=None):
+    """The corridor graph for a maze file, built once and cached beside it."""
+    return load_cached_index(maze_path, CACHE_SUFFIX, CorridorGraph, grid)
+
+
+def corridor_search(grid, start, goal, on_expand=None):
+    """One-off solve through a freshly built corridor graph (same interface as solver_core)."""
+    return CorridorGraph(grid).shortest_path(start, goal, on_expand)
@@ -0,0 +1,173 @@
+"""Incremental re-planning for mazes that change while they are being solved.
+
+``DStarLite`` keeps the search state of D* Lite (Koenig & Likhachev) between
+edits.  It searches backwards from the goal, so every open cell carries
+``g`` (its current goal distance) and ``rhs`` (the distance its neighbours
+imply).  An edit only makes the cells next to it inconsistent; re-planning
+pops those off the priority queue until the start is consistent again,
+which touches the part of the maze whose distances actually changed rather
+than the whole grid.  Moving the start (a robot walking the path) is cheap
+as well; moving the goal starts over.
+
+Only wall-ness affects the search: changing a cell between non-wall values
+(path, explored, final path...) is recorded but costs nothing.
+
+Example:
+    planner = DStarLite(grid)
+    path, stats = planner.plan()
+    path, stats = planner.apply_changes([((4, 7), WALL), ((9, 2), PATH)])
+"""
+import heapq
+
+import numpy as np
+
+import solver_core
+from solver_core import WALL, open_neighbors
+
+INFINITY = 2 ** 30
+
+
+def grid_changes(old, new):
+    """``((row, col), value)`` for every cell that differs between two grids."""
+    old, new = np.asarray(old), np.asarray(new)
+    return [((int(row), int(col)), int(new[row, col])) for row, col in np.argwhere(old != new)]
+
+
+class DStarLite:
+    def __init__(self, grid, start=None, goal=None):
+        self.grid = np.array(grid, dtype=np.uint8)  # own copy: edits go through apply_changes()
+        found_start, found_goal = solver_core.find_start_goal(self.grid)
+        start, goal = start or found_start, goal or found_goal
+        if not start or not goal:
+            raise ValueError("Start or goal not found in the grid!")
+        self.rows, self.cols = self.grid.shape
+        self.size = self.grid.size
+        self.cells = memoryview(self.grid.reshape(-1))
+        self.start, self.goal = tuple(start), tuple(goal)
+        self._stats = {"nodes_expanded": 0, "heap_pushes": 0}  # work since the last plan()/apply_changes()
+        self._reset()
+
+    def _reset(self):
+        self.g = memoryview(np.full(self.size, INFINITY, dtype=np.int32))
+        self.rhs = memoryview(np.full(self.size, INFINITY, dtype=np.int32))
+        # Key each cell is currently queued with (first component -1: not queued)
+        self.key_primary = memoryview(np.full(self.size, -1, dtype=np.int64))
+        self.key_secondary = memoryview(np.zeros(self.size, dtype=np.int64))
+        self.open_list = []  # (primary, secondary, node); stale entries skipped on pop
+        self.km = 0
+        self.target = self.goal[0] * self.cols + self.goal[1]
+        self.rhs[self.target] = 0
+        self._push(self.target)
+
+    def _h(self, index):
+        """Manhattan distance from the current start (the search runs goal to start)."""
+        row, col = divmod(index, self.cols)
+        return abs(row - self.start[0]) + abs(col - self.start[1])
+
+    def _key(self, index):
+        best = min(self.g[index], self.rhs[index])
+        return best + self._h(index) + self.km, best
+
+    def _push(self, index):
+        primary, secondary = self._key(index)
+        self.key_primary[index] = primary
+        self.key_secondary[index] = secondary
+        heapq.heappush(self.open_list, (primary, secondary, index))
+        self._stats["heap_pushes"] += 1
+
+    def _top(self):
+        open_list = self.open_list
+        while open_list:
+            primary, secondary, index = open_list[0]
+            if self.key_primary[index] == primary and self.key_secondary[index] == secondary:
+                return open_list[0]
+            heapq.heappop(open_list)
+        return None
+
+    def _update_vertex(self, index):
+        cells, g = self.cells, self.g
+        if index != self.target:
+            best = INFINITY
+            if cells[index] != WALL:
+                for neighbor in open_neighbors(cells, index, self.cols, self.size):
+                    if g[neighbor] + 1 < best:
+                        best = g[neighbor] + 1
+            self.rhs[index] = best
+        if g[index] != self.rhs[index]:
+            self._push(index)
+        else:
+            self.key_primary[index] = -1
+
+    def _compute_shortest_path(self):
+        cells, g, rhs = self.cells, self.g, self.rhs
+        source = self.start[0] * self.cols + self.start[1]
+        while True:
+            top = self._top()
+            if top is None or ((top[0], top[1]) >= self._key(source) and rhs[source] == g[source]):
+                return
+            primary, secondary, index = heapq.heappop(self.open_list)
+            self.key_primary[index] = -1
+            if (primary, secondary) < self._key(index):
+                self._push(index)  # key went stale after km grew
+                continue
+            self._stats["nodes_expanded"] += 1
+            if g[index] > rhs[index]:
+                g[index] = rhs[index]
+            else:
+                g[index] = INFINITY
+                self._update_vertex(index)
+            for neighbor in open_neighbors(cells, index, self.cols, self.size):
+                self._update_vertex(neighbor)
+
+    def _extract_path(self):
+        cells, g = self.cells, self.g
+        current = self.start[0] * self.cols + self.start[1]
+        if cells[current] == WALL or cells[self.target] == WALL or g[current] >= INFINITY:
+            return None
+        path = [self.start]
+        while current != self.target:
+            current = min(open_neighbors(cells, current, self.cols, self.size), key=g.__getitem__, default=None)
+            if current is None or g[current] >= INFINITY or len(path) > self.size:
+                return None
+            path.append(divmod(current, self.cols))
+        return path
+
+    def _replan(self, cells_changed=0):
+        self._compute_shortest_path()
+        path = self._extract_path()
+        stats = dict(self._stats, path_length=len(path) if path else 0, cells_changed=cells_changed)
+        self._stats = {"nodes_expanded": 0, "heap_pushes": 0}
+        return path, stats
+
+    def plan(self):
+        """Bring the plan up to date and return ``(path, stats)``."""
+        return self._replan()
+
+    def apply_changes(self, changes=(), start=None, goal=None):
+        """Apply ``((row, col), value)`` cell edits and optionally move start/goal, then re-plan.
+
+        Returns ``(path, stats)`` like the solvers in solver_core; ``stats``
+        counts only the work done for this batch.
+        """
+        changed = []
+        for (row, col), value in changes:
+            index = row * self.cols + col
+            if (self.cells[index] == WALL) != (value == WALL):
+                changed.append(index)
+            self.cells[index] = value
+
+        if goal is not None and tuple(goal) != self.goal:
+            self.goal = tuple(goal)
+            if start is not None:
+                self.start = tuple(start)
+            self._reset()  # every g value is a distance to the old goal
+            return self._replan(len(changed))
+
+        if start is not None and tuple(start) != self.start:
+            self.km += solver_core.heuristic(self.start, start)
+            self.start = tuple(start)
+        for index in changed:
+            self._update_vertex(index)
+            for neighbor in open_neighbors(self.cells, index, self.cols, self.size):
+                self._update_vertex(neighbor)
+        return self._replan(len(changed))
@@ -0,0 +1,302 @@
+"""Hierarchical path-finding (HPA*) with a cluster abstraction cached per maze.
+
+The maze is cut into ``cluster_size`` x ``cluster_size`` clusters.  Where
+two neighbouring clusters touch, every run of open cell pairs across the
+border is an entrance; its middle pair (both end pairs for runs of
+``LONG_ENTRANCE`` cells or more) becomes a pair of abstract nodes joined by
+a cost-1 edge.  Inside each cluster, abstract nodes are joined by their
+shortest distance through that cluster alone.  That precomputation runs
+once per maze and is saved beside it (``<maze>.clusters.npz``).
+
+A query links start and goal to the abstract nodes of their clusters, runs
+A* over the small abstract graph and refines each abstract edge back into
+cells with a search confined to one cluster.  As in the original HPA*,
+paths are near-optimal rather than guaranteed shortest: they only cross
+cluster borders at the chosen entrance cells.  maze_server.py answers
+``"algorithm": "hpa"`` queries from this abstraction.
+"""
+import heapq
+
+import numpy as np
+
+import solver_core
+from maze_io import load_cached_index, load_index, save_index
+
+CACHE_SUFFIX = ".clusters.npz"
+CLUSTER_SIZE = 16
+LONG_ENTRANCE = 6
+
+
+class HierarchicalGraph:
+    def __init__(self, grid, cluster_size=CLUSTER_SIZE):
+        self.grid = solver_core.as_grid(grid)
+        self.rows, self.cols = self.grid.shape
+        self.cluster_size = cluster_size
+        self._find_entrances()
+        self._connect_clusters()
+        self._build_adjacency()
+
+    # Construction
+
+    def _cluster_of(self, index):
+        row, col = divmod(index, self.cols)
+        return row // self.cluster_size, col // self.cluster_size
+
+    def _cluster_bounds(self, cluster):
+        top, left = cluster[0] * self.cluster_size, cluster[1] * self.cluster_size
+        return top, min(top + self.cluster_size, self.rows), left, min(left + self.cluster_size, self.cols)
+
+    def _find_entrances(self):
+        open_cells = self.grid != solver_core.WALL
+        size, cols = self.cluster_size, self.cols
+        node_of = {}
+        edge_u, edge_v, edge_cost = [], [], []
+
+        def node(index):
+            if index not in node_of:
+                node_of[index] = len(node_of)
+            return node_of[index]
+
+        def add_entrances(crossing, first_cell, step_across):
+            # ``crossing`` flags open pairs along one border; runs are split at cluster corners
+            for offset in range(0, len(crossing), size):
+                segment = crossing[offset:offset + size]
+                edges = np.flatnonzero(np.diff(np.concatenate(([0], segment.view(np.int8), [0]))))
+                for begin, end in zip(edges[::2].tolist(), edges[1::2].tolist()):
+                    picks = {begin, end - 1} if end - begin >= LONG_ENTRANCE else {(begin + end - 1) // 2}
+                    for pick in picks:
+                        inside = first_cell(offset + pick)
+                        edge_u.append(node(inside))
+                        edge_v.append(node(inside + step_across))
+                        edge_cost.append(1)
+
+        for col in range(size, cols, size):
+            add_entrances(open_cells[:, col - 1] & open_cells[:, col], lambda row, col=col: row * cols + col - 1, 1)
+        for row in range(size, self.rows, size):
+            add_entrances(open_cells[row - 1] & open_cells[row], lambda col, row=row: (row - 1) * cols + col, cols)
+
+        self.node_cells = np.array(sorted(node_of, key=node_of.get), dtype=np.int64)
+        self.entrance_edges = (edge_u, edge_v, edge_cost)
+
+    def _cluster_ids(self, indices):
+        rows, cols = np.divmod(indices, self.cols)
+        clusters_across = -(-self.cols // self.cluster_size)
+        return rows // self.cluster_size * clusters_across + cols // self.cluster_size
+
+    def _confined_distances(self, sources):
+        """BFS distances from ``sources`` where no move crosses a cluster border (-1: unreached).
+
+        With one source per cluster this is every cluster's own search at once.
+        """
+        size, cols, cluster_size = self.grid.size, self.cols, self.cluster_size
+        unvisited = (self.grid != solver_core.WALL).reshape(-1)
+        dist = np.full(size, -1, dtype=np.int32)
+        owner = np.empty(size, dtype=np.int64)
+        frontier = np.asarray(sources, dtype=np.int64)
+        unvisited[frontier] = False
+        dist[frontier] = 0
+        level = 0
+        while frontier.size:
+            row, col = np.divmod(frontier, cols)
+            candidates = np.concatenate((
+                frontier[((col + 1) % cluster_size != 0) & (col < cols - 1)] + 1,
+                frontier[col % cluster_size != 0] - 1,
+                frontier[((row + 1) % cluster_size != 0) & (frontier < size - cols)] + cols,
+                frontier[row % cluster_size != 0] - cols,
+            ))
+            candidates = candidates[unvisited[candidates]]
+            order = np.arange(candidates.size)
+            owner[candidates] = order
+            frontier = candidates[owner[candidates] == order]
+            level += 1
+            unvisited[frontier] = False
+            dist[frontier] = level
+        return dist
+
+    def _connect_clusters(self):
+        edge_u, edge_v, edge_cost = (list(values) for values in self.entrance_edges)
+        del self.entrance_edges
+        # Rank the nodes within their cluster, then search from every cluster's
+        # k-th node in one confined BFS and read off the distances to its later nodes
+        clusters = self._cluster_ids(self.node_cells)
+        nodes = np.argsort(clusters, kind="stable")
+        sorted_clusters = clusters[nodes]
+        first = np.searchsorted(sorted_clusters, sorted_clusters)
+        rank = np.empty(len(nodes), dtype=np.int64)
+        rank[nodes] = np.arange(len(nodes)) - first
+
+        for k in range(int(rank.max()) + 1 if len(rank) else 0):
+            sources = np.flatnonzero(rank == k)
+            dist = self._confined_distances(self.node_cells[sources])
+            later = np.flatnonzero(rank > k)
+            # Node that is k-th in the same cluster as each later node
+            heads = nodes[first[np.searchsorted(sorted_clusters, clusters[later])] + k]
+            reached = dist[self.node_cells[later]]
+            keep = reached > 0
+            edge_u.extend(heads[keep].tolist())
+            edge_v.extend(later[keep].tolist())
+            edge_cost.extend(reached[keep].tolist())
+
+        self.edge_u = np.array(edge_u, dtype=np.int32)
+        self.edge_v = np.array(edge_v, dtype=np.int32)
+        self.edge_cost = np.array(edge_cost, dtype=np.int32)
+
+    def _build_adjacency(self):
+        node_count = len(self.node_cells)
+        ends = np.concatenate((self.edge_u, self.edge_v))
+        others = np.concatenate((self.edge_v, self.edge_u))
+        costs = np.concatenate((self.edge_cost, self.edge_cost))
+        order = np.argsort(ends, kind="stable")
+        indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ends, minlength=node_count), out=indptr[1:])
+        self.indptr = indptr.tolist()
+        self.neighbors = others[order].tolist()
+        self.costs = costs[order].tolist()
+        self.node_index = {cell: node for node, cell in enumerate(self.node_cells.tolist())}
+        self.cluster_nodes = {}
+        for node, index in enumerate(self.node_cells.tolist()):
+            self.cluster_nodes.setdefault(self._cluster_of(index), []).append(node)
+
+    def _block(self, bounds):
+        top, bottom, left, right = bounds
+        return np.ascontiguousarray(self.grid[top:bottom, left:right])
+
+    # Caching
+
+    ARRAYS = ("node_cells", "edge_u", "edge_v", "edge_cost")
+
+    def save(self, file_path, source_signature=None):
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        arrays["cluster_size"] = np.array(self.cluster_size)
+        save_index(file_path, arrays, source_signature)
+
+    @classmethod
+    def load(cls, file_path, grid, source_signature=None, cluster_size=CLUSTER_SIZE):
+        """Load a saved abstraction for ``grid``; returns None if it is stale or unreadable."""
+        data = load_index(file_path, source_signature)
+        if data is None or any(name not in data for name in cls.ARRAYS + ("cluster_size",)):
+            return None
+        if int(data["cluster_size"]) != cluster_size:
+            return None
+        graph = cls.__new__(cls)
+        graph.grid = solver_core.as_grid(grid)
+        graph.rows, graph.cols = graph.grid.shape
+        graph.cluster_size = cluster_size
+        for name in cls.ARRAYS:
+            setattr(graph, name, data[name])
+        graph._build_adjacency()
+        return graph
+
+    # Queries
+
+    def _link(self, cell):
+        """Distances from ``cell`` within its cluster and the abstract nodes it reaches."""
+        index = cell[0] * self.cols + cell[1]
+        cluster = self._cluster_of(index)
+        top, _, left, _ = bounds = self._cluster_bounds(cluster)
+        dist = solver_core.distance_field(self._block(bounds), (cell[0] - top, cell[1] - left))
+        links = []
+        for node in self.cluster_nodes.get(cluster, []):
+            row, col = divmod(int(self.node_cells[node]), self.cols)
+            if dist[row - top, col - left] >= 0:
+                links.append((node, int(dist[row - top, col - left])))
+        return cluster, (top, left), dist, links
+
+    def _local_path(self, dist, origin, cell):
+        """Cells from a cluster distance field's source to ``cell``, in grid coordinates."""
+        top, left = origin
+        path = solver_core.path_from_distance_field(dist, (cell[0] - top, cell[1] - left))
+        return [(row + top, col + left) for row, col in path]
+
+    def shortest_path(self, start, goal, on_expand=None):
+        """Near-shortest path between two open cells as a list of (row, col), plus stats.
+
+        ``on_expand`` is called with the cell of each abstract node expanded.
+        """
+        stats = {"nodes_expanded": 0, "path_length": 0, "abstract_nodes": len(self.node_cells)}
+        for cell in (start, goal):
+            if not (0 <= cell[0] < self.rows and 0 <= cell[1] < self.cols) or self.grid[cell] == solver_core.WALL:
+                raise ValueError(f"{cell} is not an open cell")
+        start_cluster, start_origin, start_dist, start_links = self._link(start)
+        goal_cluster, goal_origin, goal_dist, goal_links = self._link(goal)
+
+        best_cost, best = None, None
+        if start_cluster == goal_cluster:
+            local_goal = (goal[0] - start_origin[0], goal[1] - start_origin[1])
+            if start_dist[local_goal] >= 0:
+                best_cost, best = int(start_dist[local_goal]), ("direct", None)
+
+        # A* over the abstract graph; the goal is reached through goal_links
+        goal_row, goal_col = goal
+        exits = dict(goal_links)
+        g_score, parent, open_list = {}, {}, []
+        for node, cost in start_links:
+            g_score[node], parent[node] = cost, None
+            row, col = divmod(int(self.node_cells[node]), self.cols)
+            heapq.heappush(open_list, (cost + abs(row - goal_row) + abs(col - goal_col), -cost, node))
+        while open_list:
+            f_score, negative_g, node = heapq.heappop(open_list)
+            if best_cost is not None and f_score >= best_cost:
+                break
+            g = -negative_g
+            if g != g_score[node]:
+                continue
+            stats["nodes_expanded"] += 1
+            if on_expand is not None:
+                on_expand(divmod(int(self.node_cells[node]), self.cols))
+            if node in exits and (best_cost is None or g + exits[node] < best_cost):
+                best_cost, best = g + exits[node], ("abstract", node)
+            for k in range(self.indptr[node], self.indptr[node + 1]):
+                neighbor, tentative = self.neighbors[k], g + self.costs[k]
+                if neighbor not in g_score or tentative < g_score[neighbor]:
+                    g_score[neighbor], parent[neighbor] = tentative, node
+                    row, col = divmod(int(self.node_cells[neighbor]), self.cols)
+                    heapq.heappush(open_list, (tentative + abs(row - goal_row) + abs(col - goal_col), -tentative, neighbor))
+
+        if best is None:
+            return None, stats
+        if best[0] == "direct":
+            path = self._local_path(start_dist, start_origin, goal)
+        else:
+            path = self._refine(best[1], parent, start_dist, start_origin, goal_dist, goal_origin)
+        stats["path_length"] = len(path)
+        return path, stats
+
+    def _refine(self, last, parent, start_dist, start_origin, goal_dist, goal_origin):
+        nodes = []
+        while last is not None:
+            nodes.append(last)
+            last = parent[last]
+        nodes.reverse()
+        cells = [divmod(int(self.node_cells[node]), self.cols) for node in nodes]
+
+        path = self._local_path(start_dist, start_origin, cells[0])
+        for here, there in zip(cells, cells[1:]):
+            if abs(here[0] - there[0]) + abs(here[1] - there[1]) == 1 and (
+                    self._cluster_of(here[0] * self.cols + here[1]) != self._cluster_of(there[0] * self.cols + there[1])):
+                path.append(there)  # entrance edge
+                continue
+            top, _, left, _ = bounds = self._cluster_bounds(self._cluster_of(here[0] * self.cols + here[1]))
+            dist = solver_core.distance_field(self._block(bounds), (here[0] - top, here[1] - left),
+                                              target=(there[0] - top, there[1] - left))
+            path.extend(self._local_path(dist, (top, left), there)[1:])
+        path.extend(self._local_path(goal_dist, goal_origin, cells[-1])[::-1][1:])
+        return path
+
+    def summary(self):
+        return {
+            "open_cells": int(np.count_nonzero(self.grid != solver_core.WALL)),
+            "cluster_size": self.cluster_size,
+            "abstract_nodes": len(self.node_cells),
+            "abstract_edges": len(self.edge_u),
+        }
+
+
+def load_hierarchical_graph(maze_path, grid=None, cluster_size=CLUSTER_SIZE):
+    """The cluster abstraction for a maze file, built once and cached beside it."""
+    return load_cached_index(maze_path, CACHE_SUFFIX, HierarchicalGraph, grid, cluster_size=cluster_size)
+
+
+def hpa_star(grid, start, goal, on_expand=None, cluster_size=CLUSTER_SIZE):
+    """One-off HPA* solve (same interface as solver_core); builds the abstraction first."""
+    return HierarchicalGraph(grid, cluster_size).shortest_path(start, goal, on_expand)
@@ -1,8 +1,18 @@
+import importlib
+import traceback
 import pygame
-import subprocess
+import maze_view
 
-def run_script(script_name):
-    subprocess.run(["python", script_name])
+# Run a generator/solver entry point in this process, reusing the open window.
+# Modules are imported on first use and stay loaded for later clicks.
+def run_entry_point(module_name, function_name):
+    try:
+        getattr(importlib.import_module(module_name), function_name)()
+    except SystemExit:
+        pass  # the visualizer's Quit button or window close: back to the menu
+    except Exception:
+        traceback.print_exc()  # a failing run must not take the launcher down with it
+    maze_view.reset_view()  # the menu is about to draw over whatever the view cached
 
 def main():
     pygame.init()
@@ -17,10 +27,10 @@ def main():
     button_y = 100
     button_spacing = 20
     buttons = [
-        (pygame.Rect(225, button_y, button_width, button_height), "Generate", "maze_generator.py"),
-        (pygame.Rect(225, button_y + button_height + button_spacing, button_width, button_height), "DFS", "dfs.py"),
-        (pygame.Rect(225, button_y + 2 * (button_height + button_spacing), button_width, button_height), "A*", "aStar.py"),
-        (pygame.Rect(225, button_y + 3 * (button_height + button_spacing), button_width, button_height), "BFS", "bfs.py"),
+        (pygame.Rect(225, button_y, button_width, button_height), "Generate", ("maze_generator", "main")),
+        (pygame.Rect(225, button_y + button_height + button_spacing, button_width, button_height), "DFS", ("dfs", "run")),
+        (pygame.Rect(225, button_y + 2 * (button_height + button_spacing), button_width, button_height), "A*", ("aStar", "run")),
+        (pygame.Rect(225, button_y + 3 * (button_height + button_spacing), button_width, button_height), "BFS", ("bfs", "run")),
         (pygame.Rect(225, button_y + 4 * (button_height + button_spacing), button_width, button_height), "Quit", None)
     ]
     
@@ -43,10 +53,14 @@ def main():
                 running = False
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_pos = pygame.mouse.get_pos()
-                for rect, _, script in buttons:
+                for rect, _, entry_point in buttons:
                     if rect.collidepoint(mouse_pos):
-                        if script:
-                            run_script(script)
+                        if entry_point:
+                            run_entry_point(*entry_point)
+                            # Take the window back from the visualizer
+                            screen = pygame.display.set_mode((screen_width, screen_height))
+                            pygame.display.set_caption("Maze Solver")
+                            pygame.event.clear()
                         else:
                             running = False
                             
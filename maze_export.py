@@ -0,0 +1,114 @@
+"""Export solved mazes as PDF or PNG.
+
+Both exports work on the whole colour-mapped grid at once instead of
+issuing a drawing call per cell:
+
+* PNG is written as an indexed-colour image straight from the grid with
+  NumPy and zlib, a band of rows at a time, so its time scales with pixels
+  and its memory stays bounded by the band size.
+* PDF paints the most common colour as one background rectangle, then one
+  rectangle per horizontal run of another colour and a single grid of cell
+  outlines, so a maze with long corridors needs a small fraction of the
+  old drawing operations.
+
+reportlab is only imported when a PDF is actually written.
+"""
+import struct
+import zlib
+
+import numpy as np
+
+COLORS = {
+    0: (0, 0, 0),  # Wall (Black)
+    1: (255, 255, 255),  # Path (White)
+    2: (0, 255, 0),  # Start (Green)
+    3: (255, 0, 0),  # Goal (Red)
+    4: (0, 0, 255),  # Final Path (Deep Blue)
+    5: (173, 216, 230)  # Explored Path (Light Blue)
+}
+
+PALETTE = np.array([COLORS[value] for value in sorted(COLORS)], dtype=np.uint8)
+PNG_BAND_BYTES = 4 * 1024 * 1024  # uncompressed scanline bytes compressed per step
+
+
+def _palette_indices(grid):
+    """Grid values as palette indices; unknown values draw as walls like before."""
+    grid = np.asarray(grid)
+    return np.where(grid < len(PALETTE), grid, 0).astype(np.uint8)
+
+
+def _png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+
+def write_grid_to_png(file_path, grid, cell_size=10):
+    """Write the maze as an indexed-colour PNG.
+
+    The image is upscaled and compressed one band of maze rows at a time,
+    each band going out as its own IDAT chunk, so a large maze never has
+    its full-size image in memory.
+    """
+    grid = np.asarray(grid)
+    rows, cols = grid.shape
+    height, width = rows * cell_size, cols * cell_size
+    band_rows = max(1, PNG_BAND_BYTES // ((width + 1) * cell_size))
+    compressor = zlib.compressobj(6)
+
+    with open(file_path, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n")
+        file.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)))
+        file.write(_png_chunk(b"PLTE", PALETTE.tobytes()))
+        for top in range(0, rows, band_rows):
+            indices = _palette_indices(grid[top:top + band_rows])
+            if cell_size > 1:
+                indices = indices.repeat(cell_size, axis=0).repeat(cell_size, axis=1)
+            scanlines = np.zeros((indices.shape[0], width + 1), dtype=np.uint8)  # filter byte 0 per line
+            scanlines[:, 1:] = indices
+            data = compressor.compress(scanlines)
+            if data:
+                file.write(_png_chunk(b"IDAT", data))
+        file.write(_png_chunk(b"IDAT", compressor.flush()))
+        file.write(_png_chunk(b"IEND", b""))
+
+
+def color_runs(grid):
+    """Yield ``(row, col, length, value)`` for each horizontal run of equal cells."""
+    indices = _palette_indices(grid)
+    rows, cols = indices.shape
+    for row in range(rows):
+        values = indices[row]
+        starts = np.concatenate(([0], np.flatnonzero(values[1:] != values[:-1]) + 1))
+        lengths = np.diff(np.concatenate((starts, [cols])))
+        yield from zip([row] * len(starts), starts.tolist(), lengths.tolist(), values[starts].tolist())
+
+
+def write_grid_to_pdf(file_path, grid, cell_size=10, margin=5):
+    """Generate a PDF representation of the solved maze."""
+    from reportlab.pdfgen import canvas
+
+    indices = _palette_indices(grid)
+    rows, cols = indices.shape
+    width = cols * cell_size + 2 * margin
+    height = rows * cell_size + 2 * margin
+
+    c = canvas.Canvas(file_path, pagesize=(width, height))
+
+    background = int(np.bincount(indices.ravel(), minlength=len(PALETTE)).argmax())
+    color = PALETTE[background] / 255
+    c.setFillColorRGB(*color)
+    c.rect(margin, margin, cols * cell_size, rows * cell_size, stroke=0, fill=1)
+
+    current = background
+    for row, col, length, value in color_runs(indices):
+        if value == background:
+            continue
+        if value != current:
+            c.setFillColorRGB(*(PALETTE[value] / 255))
+            current = value
+        c.rect(margin + col * cell_size, height - (margin + (row + 1) * cell_size),
+               length * cell_size, cell_size, stroke=0, fill=1)
+
+    # Cell outlines, as the old per-cell stroked rectangles drew them
+    c.grid([margin + col * cell_size for col in range(cols + 1)],
+           [margin + row * cell_size for row in range(rows + 1)])
+    c.save()
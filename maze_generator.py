@@ -1,7 +1,6 @@
-import pygame
 import numpy as np
 import random
-import csv
+from maze_io import write_grid_to_csv
 
 # Function to check if a cell is inside the grid
 def is_in_grid(pos, grid_dim):
@@ -22,8 +21,13 @@ def get_valid_neighbors(pos, grid, grid_dim):
     
     return neighbors
 
-# Function to generate the maze (animated)
-def generate_maze(grid, start_pos, grid_dim, screen, CELL_SIZE, MARGIN, clock, quit_button_rect):
+# Function to generate the maze (animated when a screen is given)
+def generate_maze(grid, start_pos, grid_dim, screen=None, CELL_SIZE=None, MARGIN=None, quit_button_rect=None):
+    scheduler = None
+    if screen is not None:
+        from maze_view import make_scheduler
+        scheduler = make_scheduler(grid, screen, CELL_SIZE, MARGIN, quit_button_rect)
+
     stack = [start_pos]
     grid[start_pos] = 1  # Mark start as visited
 
@@ -38,12 +42,14 @@ def generate_maze(grid, start_pos, grid_dim, screen, CELL_SIZE, MARGIN, clock, q
             grid[next_cell] = 1  # Mark the new cell as visited
             stack.append(next_cell)  # Add the new cell to the stack
 
-            # Animate the maze generation
-            display_maze(grid, screen, CELL_SIZE, MARGIN, quit_button_rect)
-            clock.tick(30)  # Control animation speed
+            # Animate the maze generation (frames are batched by the scheduler)
+            if scheduler is not None:
+                scheduler.step([path_cell, next_cell])
         else:
             stack.pop()  # Backtrack if no neighbors
 
+    if scheduler is not None:
+        scheduler.finish()
     return grid
 
 # Function to ensure multiple paths exist from start to end
@@ -59,50 +65,296 @@ def add_redundant_paths(grid, grid_dim, density=0.2):
                 grid[x, y] = 1
     return grid
 
-# Function to visualize the maze in pygame
-def display_maze(grid, screen, CELL_SIZE, MARGIN, button_rects):
-    BLACK = (0, 0, 0)  # Wall
-    WHITE = (255, 255, 255)  # Path
-    GREEN = (0, 255, 0)  # Start
-    RED = (255, 0, 0)  # End
-    rows, cols = len(grid), len(grid[0])
-
-    screen.fill(WHITE)  # Clear screen
-
-    for row in range(rows):
-        for col in range(cols):
-            color = BLACK
-            if grid[row][col] == 1:
-                color = WHITE
-            elif grid[row][col] == 2:
-                color = GREEN
-            elif grid[row][col] == 3:
-                color = RED
-            pygame.draw.rect(
-                screen,
-                color,
-                [
-                    col * (CELL_SIZE + MARGIN),
-                    row * (CELL_SIZE + MARGIN),
-                    CELL_SIZE,
-                    CELL_SIZE,
-                ],
-            )
-
-    # Draw Quit and other buttons
-    for rect, label in button_rects:
-        pygame.draw.rect(screen, (200, 0, 0), rect)
-        font = pygame.font.Font(None, 24)
-        text = font.render(label, True, WHITE)
-        text_rect = text.get_rect(center=rect.center)
-        screen.blit(text, text_rect)
-
-    pygame.display.flip()
+# Headless fast generator: Sidewinder on the same 2-cell lattice as generate_maze().
+# Each lattice row is split into random east-running runs and every run opens
+# north from one random member, so the whole maze is a few array operations
+# and the result is still a perfect maze (a spanning tree of the lattice).
+# It is visibly biased, though: the top row is one open corridor and every
+# cell has a route north that never turns south.  Use generate_maze_kruskal()
+# for mazes people solve; Sidewinder is for when raw speed matters most.
+def generate_maze_fast(grid_dim, start_pos=(0, 0), seed=None, rng=None):
+    rows, cols = grid_dim
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    grid = np.zeros((rows, cols), dtype=np.uint8)
+    row0, col0 = start_pos[0] % 2, start_pos[1] % 2
+    lattice_rows, lattice_cols = len(range(row0, rows, 2)), len(range(col0, cols, 2))
+    if not lattice_rows or not lattice_cols:
+        return grid
+
+    # east[r, c]: lattice cell (r, c) opens towards (r, c + 1); the top row is one corridor
+    east = rng.random((lattice_rows, lattice_cols - 1), dtype=np.float32) < 0.5
+    east[0] = True
+
+    # A run starts at column 0 and after every cell that does not open east
+    run_start = np.ones((lattice_rows, lattice_cols), dtype=bool)
+    run_start[:, 1:] = ~east
+    starts = np.flatnonzero(run_start[1:])  # runs below the top row
+    lengths = np.diff(np.append(starts, (lattice_rows - 1) * lattice_cols))
+    chosen = starts + (rng.random(len(starts)) * lengths).astype(np.int64)
+    north_rows, north_cols = np.divmod(chosen, lattice_cols)
+    north_rows += 1
+
+    grid[row0::2, col0::2] = 1
+    east_rows, east_cols = np.nonzero(east)
+    grid[row0 + 2 * east_rows, col0 + 2 * east_cols + 1] = 1
+    grid[row0 + 2 * north_rows - 1, col0 + 2 * north_cols] = 1
+    return grid
+
+
+# Merge the components of a Boruvka round: parent[v] is the component at the
+# other end of v's cheapest edge.  Two components that picked the same edge
+# point at each other and the smaller becomes the root; pointer jumping then
+# only revisits entries that have not reached a root yet.  Returns each
+# vertex's new component number (roots numbered in order) and their count.
+def _boruvka_labels(parent):
+    vertices = np.arange(len(parent), dtype=parent.dtype)
+    mutual = (parent[parent] == vertices) & (vertices < parent)
+    parent[mutual] = vertices[mutual]
+    active = np.flatnonzero(parent[parent] != parent)
+    while active.size:
+        grand = parent[parent[active]]
+        parent[active] = grand
+        active = active[parent[grand] != grand]
+    labels = np.cumsum(parent == vertices, dtype=parent.dtype)
+    labels -= 1
+    return labels[parent], int(labels[-1]) + 1
+
+
+# Headless unbiased generator: randomized Kruskal on the same 2-cell lattice.
+# Every lattice edge gets a distinct random key (random high bits, edge id in
+# the low bits) and the minimum spanning tree is built in Boruvka rounds: each
+# component takes its cheapest edge to another component.  That is the tree
+# randomized Kruskal builds, with no direction favoured.  The first round runs
+# on the lattice as 2-D arrays; later rounds work on the contracted graph, so
+# the arrays shrink with the number of components.  Edge e < n joins cell e to
+# its east neighbour, edge n + e joins it to its south one.
+# Roughly 4x slower than Sidewinder: about 1.5 s for 4001x4001 and 10 s for
+# 10001x10001 on one core, with ~1.7 GB peak at that size.
+def generate_maze_kruskal(grid_dim, start_pos=(0, 0), seed=None, rng=None):
+    rows, cols = grid_dim
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    grid = np.zeros((rows, cols), dtype=np.uint8)
+    row0, col0 = start_pos[0] % 2, start_pos[1] % 2
+    lattice_rows, lattice_cols = len(range(row0, rows, 2)), len(range(col0, cols, 2))
+    n = lattice_rows * lattice_cols
+    if not n:
+        return grid
+    grid[row0::2, col0::2] = 1
+    if n == 1:
+        return grid
+
+    id_bits = (2 * n - 1).bit_length()
+    id_mask = np.uint64((1 << id_bits) - 1)
+    no_edge = np.iinfo(np.uint64).max
+    keys = rng.bit_generator.random_raw(2 * n)
+    keys &= ~id_mask
+    keys |= np.arange(2 * n, dtype=np.uint64)
+    east, south = keys[:n].reshape(lattice_rows, lattice_cols), keys[n:].reshape(lattice_rows, lattice_cols)
+    east[:, -1] = no_edge
+    south[-1] = no_edge
+    index = np.int32 if 4 * n < 2 ** 31 else np.int64
+    in_tree = np.zeros(2 * n, dtype=bool)
+
+    # Round one: each cell's cheapest of its east, south, west and north edges
+    cheapest = np.minimum(east, south)
+    np.minimum(cheapest[:, 1:], east[:, :-1], out=cheapest[:, 1:])
+    np.minimum(cheapest[1:], south[:-1], out=cheapest[1:])
+    cheapest &= id_mask
+    chosen = cheapest.reshape(-1).astype(index)
+    del cheapest
+    in_tree[chosen] = True
+    # The other end is (west/north end + east/south end) - cell
+    other = np.where(chosen >= n, lattice_cols - 2 * n, 1).astype(index)
+    other += 2 * chosen
+    other -= np.arange(n, dtype=index)
+    cell_component, count = _boruvka_labels(other)
+
+    # Contract: keep the edges between different components, by component
+    component = cell_component.reshape(lattice_rows, lattice_cols)
+    edge_u, edge_v, edge_key = [], [], []
+    for u, v, key in ((component[:, :-1], component[:, 1:], east[:, :-1]),
+                      (component[:-1], component[1:], south[:-1])):
+        crossing = u != v
+        edge_u.append(u[crossing])
+        edge_v.append(v[crossing])
+        edge_key.append(key[crossing])
+    edge_u, edge_v, edge_key = np.concatenate(edge_u), np.concatenate(edge_v), np.concatenate(edge_key)
+    del component, crossing, keys, east, south
+
+    relabels = [cell_component]  # cell -> component after each round
+    while count > 1:
+        cheapest = np.full(count, no_edge, dtype=np.uint64)
+        np.minimum.at(cheapest, edge_u, edge_key)
+        np.minimum.at(cheapest, edge_v, edge_key)
+        cheapest &= id_mask
+        chosen = cheapest.astype(index)
+        in_tree[chosen] = True
+        # Components at both ends of each chosen edge, from the cells it joins
+        south_edge = chosen >= n
+        end_u = np.where(south_edge, chosen - n, chosen)
+        end_v = end_u + np.where(south_edge, lattice_cols, 1).astype(index)
+        for relabel in relabels:
+            end_u, end_v = relabel[end_u], relabel[end_v]
+        end_u += end_v
+        end_u -= np.arange(count, dtype=index)
+        relabel, count = _boruvka_labels(end_u)
+        relabels.append(relabel)
+        edge_u, edge_v = relabel[edge_u], relabel[edge_v]
+        crossing = edge_u != edge_v
+        edge_u, edge_v, edge_key = edge_u[crossing], edge_v[crossing], edge_key[crossing]
+
+    # Carve the wall cell of every tree edge
+    east_tree = in_tree[:n].reshape(lattice_rows, lattice_cols)[:, :-1]
+    grid[row0::2, col0 + 1::2][:, :lattice_cols - 1][east_tree] = 1
+    south_tree = in_tree[n:].reshape(lattice_rows, lattice_cols)[:-1]
+    grid[row0 + 1::2, col0::2][:lattice_rows - 1][south_tree] = 1
+    return grid
+
+
+# Vectorised whole-grid generators by name; Kruskal is the unbiased default
+FAST_GENERATORS = {"kruskal": generate_maze_kruskal, "sidewinder": generate_maze_fast}
+DEFAULT_GENERATOR = "kruskal"
+
+
+# Vectorised add_redundant_paths(): every sampled wall cell is checked against
+# the grid as it was before this pass rather than after the previous carve.
+def add_redundant_paths_fast(grid, density=0.2, seed=None, rng=None):
+    rows, cols = grid.shape
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    count = int(rows * cols * density)
+    if rows < 3 or cols < 3 or not count:
+        return grid
+    x = rng.integers(1, rows - 1, count)
+    y = rng.integers(1, cols - 1, count)
+    walls = grid[x, y] == 0
+    x, y = x[walls], y[walls]
+
+    # Same candidates as get_valid_neighbors(): 2-cell steps landing on a wall
+    steps = np.array([(-2, 0), (2, 0), (0, -2), (0, 2)])
+    nx = x[:, None] + steps[:, 0]
+    ny = y[:, None] + steps[:, 1]
+    valid = (nx >= 0) & (nx < rows) & (ny >= 0) & (ny < cols)
+    valid[valid] = grid[nx[valid], ny[valid]] == 0
+
+    # Pick one valid direction per sample at random
+    keys = np.where(valid, rng.random(valid.shape), -1.0)
+    direction = keys.argmax(axis=1)
+    has_neighbor = valid.any(axis=1)
+    x, y, direction = x[has_neighbor], y[has_neighbor], direction[has_neighbor]
+    grid[x + steps[direction, 0] // 2, y + steps[direction, 1] // 2] = 1
+    grid[x, y] = 1
+    return grid
+
+
+# Streaming generator: Eller's algorithm keeps only the set labels of the
+# current lattice row, so arbitrarily tall mazes are produced in constant
+# memory and written out chunk by chunk.  loop_density is the chance of
+# opening an east wall between cells that are already connected, which adds
+# redundant paths without a second pass over the maze.
+def _eller_row(labels, rng, last_row, loop_density):
+    width = len(labels)
+    join = np.ones(width - 1, dtype=bool) if last_row else rng.random(width - 1) < 0.5
+    loops = rng.random(width - 1) < loop_density
+    east = np.zeros(width - 1, dtype=bool)
+    parent = {}
+
+    def find(label):
+        root = label
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while label != root:  # path compression
+            parent[label], label = root, parent.get(label, label)
+        return root
+
+    row = labels.tolist()
+    for i in range(width - 1):
+        left, right = row[i], row[i + 1]
+        if left in parent:
+            left = find(left)
+        if right in parent:
+            right = find(right)
+        if left != right:
+            if join[i]:
+                parent[right] = left
+                east[i] = True
+        elif loops[i] and not last_row:
+            east[i] = True
+    unique_labels, inverse = np.unique(labels, return_inverse=True)
+    roots = np.array([find(label) for label in unique_labels.tolist()], dtype=np.int64)[inverse]
+    return east, roots
+
+
+def _eller_down(roots, rng, next_label):
+    # Every set continues downwards through at least one random member
+    down = rng.random(len(roots)) < 0.5
+    _, group = np.unique(roots, return_inverse=True)
+    order = np.lexsort((rng.random(len(roots)), group))
+    sorted_groups = group[order]
+    last_of_group = np.append(sorted_groups[1:] != sorted_groups[:-1], True)
+    down[order[last_of_group]] = True
+
+    fresh = np.flatnonzero(~down)
+    labels = roots.copy()
+    labels[fresh] = next_label + np.arange(len(fresh))
+    return down, labels, next_label + len(fresh)
+
+
+def iter_maze_rows(grid_dim, start_pos=(0, 0), goal_pos=None, loop_density=0.0, seed=None, chunk_rows=1024):
+    """Yield the maze as uint8 blocks of at most ``chunk_rows`` rows."""
+    rows, cols = grid_dim
+    rng = np.random.default_rng(seed)
+    row0, col0 = start_pos[0] % 2, start_pos[1] % 2
+    lattice_rows, width = len(range(row0, rows, 2)), len(range(col0, cols, 2))
+    labels = np.arange(width, dtype=np.int64)
+    next_label = width
+    down = np.zeros(width, dtype=bool)
+    chunk = np.zeros((chunk_rows, cols), dtype=np.uint8)
+    filled = 0
+
+    for r in range(rows):
+        line = chunk[filled]
+        line[:] = 0
+        lattice_row, offset = divmod(r - row0, 2)
+        if r >= row0 and width and lattice_row < lattice_rows:
+            if offset == 0:
+                east, roots = _eller_row(labels, rng, lattice_row == lattice_rows - 1, loop_density)
+                line[col0::2] = 1
+                line[col0 + 1::2][:width - 1][east] = 1
+                if lattice_row < lattice_rows - 1:
+                    down, labels, next_label = _eller_down(roots, rng, next_label)
+            elif lattice_row < lattice_rows - 1:
+                line[col0::2][down] = 1
+
+        for pos, value in ((start_pos, 2), (goal_pos, 3)):
+            if pos is not None and pos[0] == r:
+                line[pos[1]] = value
+        filled += 1
+        if filled == chunk_rows:
+            yield chunk.copy()
+            filled = 0
+    if filled:
+        yield chunk[:filled].copy()
+
+
+def generate_maze_to_file(file_path, grid_dim, start_pos=(0, 0), goal_pos=None, loop_density=0.0, seed=None):
+    """Stream a generated maze straight into a .csv or .maze file."""
+    from maze_io import write_csv_row_chunks, write_maze_chunks
+
+    chunks = iter_maze_rows(grid_dim, start_pos, goal_pos, loop_density, seed)
+    if file_path.endswith(".maze"):
+        write_maze_chunks(file_path, chunks)
+    else:
+        write_csv_row_chunks(file_path, chunks)
+
+
+# Function to visualize the maze in pygame (only changed cells are redrawn)
+def display_maze(grid, screen, CELL_SIZE, MARGIN, button_rects, cells=None):
+    from maze_view import display_maze as draw_maze
+
+    draw_maze(grid, screen, CELL_SIZE, MARGIN, button_rects, cells)
 
 def save_maze(grid, file_path):
-    with open(file_path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerows(grid)
+    write_grid_to_csv(file_path, grid)
     print(f"Maze saved to {file_path}")
 
 # Function to find the next available maze index based on existing files
@@ -120,13 +372,15 @@ def get_next_maze_index(directory):
             return i
 
 def main():
+    import pygame
+
+    embedded = pygame.display.get_init()  # launched from main.py, which owns the window
     pygame.init()
     CELL_SIZE, MARGIN, ROWS, COLS = 15, 2, 35, 35
     START_POS, END_POS = None, None
     screen_width, screen_height = COLS * (CELL_SIZE + MARGIN), ROWS * (CELL_SIZE + MARGIN) + 50
     screen = pygame.display.set_mode((screen_width, screen_height))
     pygame.display.set_caption("Interactive Maze Generator")
-    clock = pygame.time.Clock()
 
     button_width, button_height = 100, 40
     button_y = screen_height - 45
@@ -166,7 +420,7 @@ def main():
                             setting_end = True
                         elif label == "Generate" and START_POS and END_POS:
                             # Generate the maze, add redundant paths and save it
-                            grid = generate_maze(grid, START_POS, (ROWS, COLS), screen, CELL_SIZE, MARGIN, clock, button_rects)
+                            grid = generate_maze(grid, START_POS, (ROWS, COLS), screen, CELL_SIZE, MARGIN, button_rects)
                             grid = add_redundant_paths(grid, (ROWS, COLS), density=0.15)
                             grid[START_POS] = 2  # Mark start
                             grid[END_POS] = 3    # Mark end
@@ -184,7 +438,49 @@ def main():
                         grid[row, col] = 3  # Mark end position
                         setting_end = False
         
-    pygame.quit()
+    if not embedded:
+        pygame.quit()
+
+def headless_main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a maze file without opening a window.")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--cols", type=int, required=True)
+    parser.add_argument("--output", required=True, help="destination .csv or .maze file")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--density", type=float, default=0.15,
+                        help="redundant-path density (loop probability with --stream)")
+    parser.add_argument("--stream", action="store_true",
+                        help="generate row by row in constant memory (Eller's algorithm)")
+    parser.add_argument("--generator", choices=sorted(FAST_GENERATORS), default=DEFAULT_GENERATOR,
+                        help="in-memory generator: kruskal is unbiased (about 10 s for 10001x10001); "
+                             "sidewinder leaves an open top row but is the one that does 10001x10001 "
+                             "in under 2 s")
+    args = parser.parse_args(argv)
+
+    start = (0, 0)
+    goal = ((args.rows - 1) // 2 * 2, (args.cols - 1) // 2 * 2)  # bottom-right lattice cell
+    if args.stream:
+        generate_maze_to_file(args.output, (args.rows, args.cols), start, goal, args.density, args.seed)
+    else:
+        from maze_io import write_grid_to_maze
+
+        rng = np.random.default_rng(args.seed)
+        grid = FAST_GENERATORS[args.generator]((args.rows, args.cols), start, rng=rng)
+        add_redundant_paths_fast(grid, args.density, rng=rng)
+        grid[start] = 2
+        grid[goal] = 3
+        if args.output.endswith(".maze"):
+            write_grid_to_maze(args.output, grid)
+        else:
+            write_grid_to_csv(args.output, grid)
+    print(f"Maze saved to {args.output}")
 
 if __name__ == "__main__":
-    main()
+    import sys
+
+    if len(sys.argv) > 1:
+        headless_main()
+    else:
+        main()
@@ -0,0 +1,357 @@
+"""Reading and writing maze grids.
+
+Kept free of pygame and reportlab so headless tools can load and save
+mazes without pulling in the visualizers.
+
+Maze CSVs hold one digit per cell, so they are parsed and written in bulk
+as byte arrays instead of going through the csv module cell by cell.  Files
+with multi-digit values fall back to a general parser.  For files larger
+than memory, ``iter_csv_row_chunks()`` and ``write_csv_row_chunks()`` work a
+block of rows at a time.
+
+Large mazes can also be stored in a binary ``.maze`` container: a 64-byte
+header (dimensions, start, goal, flags) followed by one uint8 per cell, or
+by a row-wise bit-packed wall mask when written with ``packed=True``.
+Unpacked files are loaded with ``np.memmap``, so they cost nothing to parse
+and processes solving the same file share one copy in the page cache.
+
+Weighted mazes carry a terrain layer: one integer cost (1-255) per cell for
+stepping onto it.  A ``.maze`` file stores it as a uint8 layer after the
+cells (``FLAG_COSTS``); a CSV maze keeps it in a ``costs_<name>.csv`` file
+next to it, named so the ``maze_*.csv`` globs never pick it up.
+
+Search indexes built from a maze (corridor graphs, HPA* clusters) are
+cached beside it as ``<maze><suffix>`` .npz files tagged with the maze
+file's size and mtime; ``load_cached_index()`` rebuilds them when the maze
+changes.
+"""
+import csv
+import glob
+import os
+import struct
+
+import numpy as np
+
+CHUNK_ROWS = 1024
+LINE_TERMINATOR = b"\r\n"  # what csv.writer has always produced for these files
+
+_ZERO, _NINE = ord("0"), ord("9")
+
+MAZE_MAGIC = b"MAZE"
+MAZE_VERSION = 1
+MAZE_HEADER = struct.Struct("<4sHHIIiiii")  # magic, version, flags, rows, cols, start, goal
+MAZE_HEADER_SIZE = 64  # header is padded so the cell data starts aligned
+FLAG_PACKED = 1
+FLAG_COSTS = 2
+COSTS_PREFIX = "costs_"
+
+
+def _parse_csv_bytes(data):
+    """Parse CSV text of single-digit cells; returns None if that assumption fails.
+
+    With one digit per cell every line has the same length, so the file is
+    viewed as a (rows, line_length) byte table and the digits are read out
+    of the even columns without any per-cell work.
+    """
+    newline = data.find(b"\n")
+    if newline <= 0:
+        return None
+    if not data.endswith(b"\n"):
+        # Give the last line the same terminator as the others
+        data += b"\r\n" if data[newline - 1:newline] == b"\r" else b"\n"
+    first_line = data[:newline].rstrip(b"\r")
+    cols = len(first_line) // 2 + 1
+    line_length = newline + 1
+    if len(first_line) != 2 * cols - 1 or len(data) % line_length:
+        return None
+
+    table = np.frombuffer(data, dtype=np.uint8).reshape(-1, line_length)
+    cells = table[:, 0:2 * cols:2]
+    if cells.min() < _ZERO or cells.max() > _NINE:
+        return None
+    if np.any(table[:, 1:2 * cols - 1:2] != ord(",")) or np.any(table[:, 2 * cols - 1:] != table[0, 2 * cols - 1:]):
+        return None
+    return cells - _ZERO
+
+
+def _read_csv_generic(lines, dtype=np.uint8):
+    return np.array([list(map(int, row)) for row in csv.reader(lines) if row], dtype=dtype)
+
+
+def read_grid_from_csv(file_path):
+    with open(file_path, mode='rb') as file:
+        data = file.read()
+    grid = _parse_csv_bytes(data)
+    if grid is None:
+        grid = _read_csv_generic(data.decode().splitlines())
+    return grid
+
+
+def iter_csv_row_chunks(file_path, chunk_rows=CHUNK_ROWS):
+    """Yield the maze in blocks of at most ``chunk_rows`` rows (uint8 arrays)."""
+    with open(file_path, mode='rb') as file:
+        while True:
+            lines = [file.readline() for _ in range(chunk_rows)]
+            lines = [line for line in lines if line.strip()]
+            if not lines:
+                return
+            data = b"".join(lines)
+            chunk = _parse_csv_bytes(data)
+            if chunk is None:
+                chunk = _read_csv_generic(data.decode().splitlines())
+            yield chunk
+
+
+def _format_csv_bytes(grid):
+    grid = np.asarray(grid)
+    if grid.size and (grid.min() < 0 or grid.max() > 9):
+        return None
+    rows, cols = grid.shape
+    # Row layout: d,d,...,d\r\n  -> 2 * cols + 1 bytes
+    out = np.full((rows, 2 * cols + 1), ord(","), dtype=np.uint8)
+    out[:, 0:2 * cols:2] = grid.astype(np.uint8) + _ZERO
+    out[:, -2:] = np.frombuffer(LINE_TERMINATOR, dtype=np.uint8)
+    return out.tobytes()
+
+
+def _write_chunk(file, grid):
+    data = _format_csv_bytes(grid)
+    if data is None:
+        lines = [",".join(map(str, row)).encode() + LINE_TERMINATOR for row in np.asarray(grid).tolist()]
+        data = b"".join(lines)
+    file.write(data)
+
+
+def write_grid_to_csv(file_path, grid):
+    with open(file_path, mode='wb') as file:
+        _write_chunk(file, grid)
+
+
+def write_csv_row_chunks(file_path, chunks):
+    """Write an iterable of row blocks to one CSV file without holding the whole maze."""
+    with open(file_path, mode='wb') as file:
+        for chunk in chunks:
+            _write_chunk(file, np.atleast_2d(chunk))
+
+
+def read_maze_header(file_path):
+    """Return the header of a ``.maze`` file as a dict."""
+    with open(file_path, mode='rb') as file:
+        raw = file.read(MAZE_HEADER.size)
+    if len(raw) < MAZE_HEADER.size:
+        raise ValueError(f"{file_path} is not a maze file")
+    magic, version, flags, rows, cols, start_row, start_col, goal_row, goal_col = MAZE_HEADER.unpack(raw)
+    if magic != MAZE_MAGIC or version != MAZE_VERSION:
+        raise ValueError(f"{file_path} is not a version {MAZE_VERSION} maze file")
+    return {
+        "rows": rows,
+        "cols": cols,
+        "start": (start_row, start_col) if start_row >= 0 else None,
+        "goal": (goal_row, goal_col) if goal_row >= 0 else None,
+        "packed": bool(flags & FLAG_PACKED),
+        "costs": bool(flags & FLAG_COSTS),
+    }
+
+
+def _cell_bytes(header):
+    """Size of the cell data that follows the header."""
+    row_bytes = (header["cols"] + 7) // 8 if header["packed"] else header["cols"]
+    return header["rows"] * row_bytes
+
+
+def _pack_header(rows, cols, start, goal, packed, costs=False):
+    start = start or (-1, -1)
+    goal = goal or (-1, -1)
+    flags = (FLAG_PACKED if packed else 0) | (FLAG_COSTS if costs else 0)
+    header = MAZE_HEADER.pack(MAZE_MAGIC, MAZE_VERSION, flags,
+                              rows, cols, start[0], start[1], goal[0], goal[1])
+    return header.ljust(MAZE_HEADER_SIZE, b"\0")
+
+
+def _last_cell(chunk, value, row_offset):
+    hits = np.argwhere(chunk == value)
+    if not len(hits):
+        return None
+    return row_offset + int(hits[-1][0]), int(hits[-1][1])
+
+
+def write_maze_chunks(file_path, chunks, packed=False, costs=None):
+    """Write row blocks to a ``.maze`` file; start/goal are picked up on the way.
+
+    Packed files keep only the wall mask (plus start/goal from the header),
+    so explored/path markings are lost; use them for input mazes.  ``costs``
+    (a rows x cols array) is appended as the terrain layer.
+    """
+    rows, cols, start, goal = 0, None, None, None
+    with open(file_path, mode='wb') as file:
+        file.write(b"\0" * MAZE_HEADER_SIZE)
+        for chunk in chunks:
+            chunk = np.atleast_2d(np.asarray(chunk, dtype=np.uint8))
+            cols = chunk.shape[1]
+            start = _last_cell(chunk, 2, rows) or start
+            goal = _last_cell(chunk, 3, rows) or goal
+            if packed:
+                chunk = np.packbits(chunk != 0, axis=1)
+            file.write(np.ascontiguousarray(chunk).tobytes())
+            rows += chunk.shape[0]
+        if costs is not None:
+            costs = check_costs(costs, (rows, cols or 0))
+            for row in range(0, rows, CHUNK_ROWS):
+                file.write(np.ascontiguousarray(costs[row:row + CHUNK_ROWS]).tobytes())
+        file.seek(0)
+        file.write(_pack_header(rows, cols or 0, start, goal, packed, costs is not None))
+
+
+def write_grid_to_maze(file_path, grid, packed=False, costs=None):
+    write_maze_chunks(file_path, [grid], packed=packed, costs=costs)
+
+
+def load_maze(file_path, mode='c'):
+    """Load a ``.maze`` file as a 2-D uint8 grid.
+
+    Unpacked files are memory-mapped; the default copy-on-write mode lets a
+    solver mark cells without touching the file or the pages other
+    processes share.  Packed files are unpacked into memory.
+    """
+    header = read_maze_header(file_path)
+    rows, cols = header["rows"], header["cols"]
+    if not header["packed"]:
+        return np.memmap(file_path, dtype=np.uint8, mode=mode, offset=MAZE_HEADER_SIZE, shape=(rows, cols))
+
+    packed = np.fromfile(file_path, dtype=np.uint8, count=_cell_bytes(header), offset=MAZE_HEADER_SIZE)
+    grid = np.unpackbits(packed.reshape(rows, -1), axis=1, count=cols)
+    for key, value in (("start", 2), ("goal", 3)):
+        if header[key]:
+            grid[header[key]] = value
+    return grid
+
+
+def load_maze_costs(file_path, mode='r'):
+    """The terrain layer of a ``.maze`` file (memory-mapped), or None if it has none."""
+    header = read_maze_header(file_path)
+    if not header["costs"]:
+        return None
+    return np.memmap(file_path, dtype=np.uint8, mode=mode, offset=MAZE_HEADER_SIZE + _cell_bytes(header),
+                     shape=(header["rows"], header["cols"]))
+
+
+def check_costs(costs, shape):
+    """Validate a terrain layer: integer costs of 1-255 per cell, same shape as the maze."""
+    costs = np.asarray(costs)
+    if costs.shape != tuple(shape):
+        raise ValueError(f"cost layer is {costs.shape}, maze is {tuple(shape)}")
+    if costs.size and (costs.min() < 1 or costs.max() > 255):
+        raise ValueError("cell costs must be between 1 and 255")
+    return costs.astype(np.uint8, copy=False)
+
+
+def costs_path_for(csv_path):
+    """Where the terrain layer of a CSV maze lives: ``costs_<name>.csv`` beside it."""
+    directory, name = os.path.split(csv_path)
+    return os.path.join(directory, COSTS_PREFIX + name)
+
+
+def write_costs_to_csv(csv_path, costs):
+    """Write the terrain layer for the CSV maze at ``csv_path``."""
+    write_grid_to_csv(costs_path_for(csv_path), np.asarray(costs))
+
+
+def read_costs(file_path, shape=None):
+    """The terrain layer of a maze file (``.maze`` or CSV), or None for a unit-cost maze.
+
+    A CSV layer is validated with ``check_costs()`` against ``shape`` (the
+    maze's, when given); a bad layer raises ValueError.
+    """
+    if file_path.endswith(".maze"):
+        return load_maze_costs(file_path)
+    costs_path = costs_path_for(file_path)
+    if not os.path.exists(costs_path):
+        return None
+    with open(costs_path, mode='rb') as file:
+        data = file.read()
+    costs = _parse_csv_bytes(data)
+    if costs is None:
+        # Parse wide so out-of-range costs are reported instead of overflowing uint8
+        costs = _read_csv_generic(data.decode().splitlines(), dtype=np.int64)
+    return check_costs(costs, costs.shape if shape is None else shape)
+
+
+def csv_to_maze(csv_path, maze_path, packed=False, chunk_rows=CHUNK_ROWS):
+    """Convert a maze CSV (and its terrain layer, if any) to a ``.maze`` file."""
+    write_maze_chunks(maze_path, iter_csv_row_chunks(csv_path, chunk_rows), packed=packed,
+                      costs=read_costs(csv_path))
+
+
+def maze_to_csv(maze_path, csv_path, chunk_rows=CHUNK_ROWS):
+    """Convert a ``.maze`` file back to the CSV layout."""
+    grid = load_maze(maze_path, mode='r')
+    write_csv_row_chunks(csv_path, (grid[row:row + chunk_rows] for row in range(0, len(grid), chunk_rows)))
+    costs = load_maze_costs(maze_path)
+    if costs is not None:
+        write_costs_to_csv(csv_path, costs)
+
+
+def read_grid(file_path):
+    """Load a maze from either a ``.maze`` file or a CSV file."""
+    if file_path.endswith(".maze"):
+        return load_maze(file_path)
+    return read_grid_from_csv(file_path)
+
+
+def maze_index(file_path):
+    """Return N for a file named ``..._N.csv`` (or ``..._N.maze``)."""
+    return int(os.path.basename(file_path).split('_')[-1].split('.')[0])
+
+
+def list_maze_inputs(directory, pattern="maze_*.csv"):
+    """All maze files in ``directory`` matching ``pattern``, ordered by index."""
+    return sorted(glob.glob(os.path.join(directory, pattern)), key=maze_index)
+
+
+def maze_signature(file_path):
+    """Size and mtime of a maze file; a cache built from it is stale once these change."""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def save_index(file_path, arrays, source_signature=None):
+    """Write an index's named arrays as a compressed .npz, tagged with its maze's signature."""
+    arrays = dict(arrays)
+    if source_signature is not None:
+        arrays["source_signature"] = np.array(source_signature, dtype=np.int64)
+    with open(file_path, "wb") as file:
+        np.savez_compressed(file, **arrays)
+
+
+def load_index(file_path, source_signature=None):
+    """The arrays ``save_index`` wrote, as a dict; None if unreadable or built from another maze."""
+    try:
+        with np.load(file_path) as data:
+            if source_signature is not None:
+                stored = data["source_signature"].tolist() if "source_signature" in data else None
+                if stored != list(source_signature):
+                    return None
+            return {name: data[name] for name in data.files}
+    except (OSError, ValueError, EOFError):
+        return None
+
+
+def load_cached_index(maze_path, suffix, index_class, grid=None, **options):
+    """An index over a maze file, built once and cached beside it as ``<maze><suffix>``.
+
+    ``index_class(grid, **options)`` builds the index, ``index.save(path,
+    signature)`` writes it and ``index_class.load(path, grid, signature,
+    **options)`` reads it back or returns None when it cannot be used.
+    """
+    if grid is None:
+        grid = read_grid(maze_path)
+    signature = maze_signature(maze_path)
+    cache_path = maze_path + suffix
+    index = index_class.load(cache_path, grid, signature, **options) if os.path.exists(cache_path) else None
+    if index is None:
+        index = index_class(grid, **options)
+        try:
+            index.save(cache_path, signature)
+        except OSError:
+            pass  # read-only maze directory: keep the in-memory index
+    return index
@@ -0,0 +1,358 @@
+"""Local path-query server that keeps mazes warm between requests.
+
+A single long-running asyncio process answers JSON requests over HTTP on
+localhost (or on a Unix socket with ``--unix``), so a query costs the search
+rather than starting an interpreter and importing pygame and reportlab.
+Parsed mazes, their start/goal cells and their ``PathService`` distance
+fields stay cached (least recently used mazes are dropped beyond
+``--max-mazes``; a maze is reloaded when its file changes).  Searches run on
+one worker thread so the event loop keeps accepting connections.
+
+Endpoints (maze names are relative to ``--root``):
+    GET  /health
+    GET  /mazes
+    POST /solve     {"maze": "maze_1.csv", "algorithm": "aStar", "start": [r, c], "goal": [r, c]}
+    POST /generate  {"rows": 41, "cols": 41, "seed": 1, "density": 0.15, "name": "maze_9.csv"}
+
+``/generate`` builds unbiased mazes with randomized Kruskal; pass
+``"generator": "sidewinder"`` for the faster, top-row-biased one.  With
+``"name"`` (a plain ``*.csv`` or ``*.maze`` file name) the maze is saved
+under ``--root``; an existing file is only replaced with ``"overwrite": true``.
+
+``algorithm`` is any key of ``solver_core.SOLVERS``, ``"cached"`` for the
+distance-field cache, or ``"corridor"`` / ``"hpa"`` for the corridor graph
+(corridor_graph.py) and the HPA* clusters (hpa_star.py).  Those two indexes
+are loaded from their cache files beside the maze, or built and saved there,
+on a maze's first such query.  ``start``/``goal`` default to the maze's
+cells 2 and 3.
+The weighted solvers (``dijkstra``, ``aStar_weighted``) search the maze's
+terrain layer when it has one (see maze_io.read_costs).
+
+Example:
+    python maze_server.py --port 8765
+    curl -d '{"maze": "maze_1.csv"}' http://127.0.0.1:8765/solve
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import solver_core
+from corridor_graph import load_corridor_graph
+from hpa_star import load_hierarchical_graph
+from maze_generator import DEFAULT_GENERATOR, FAST_GENERATORS, add_redundant_paths_fast
+from maze_io import COSTS_PREFIX, costs_path_for, maze_signature, read_costs, read_grid, write_grid_to_csv, write_grid_to_maze
+from path_service import PathService
+
+BASE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_MAZES = 16
+MAX_BODY = 1024 * 1024
+MAX_GENERATED_CELLS = 25_000_000
+
+REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+MAZE_SUFFIXES = (".csv", ".maze")
+INDEX_LOADERS = {"corridor": load_corridor_graph, "hpa": load_hierarchical_graph}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class MazeEntry:
+    def __init__(self, grid, signature=None, costs=None, path=None):
+        self.grid = solver_core.as_grid(grid)
+        self.signature = signature
+        self.costs = costs  # terrain layer for the weighted solvers, None for unit costs
+        self.path = path
+        self.start, self.goal = solver_core.find_start_goal(self.grid)
+        self.service = PathService(self.grid)
+        self.indexes = {}  # INDEX_LOADERS key -> index, loaded on first use
+
+    def index(self, kind):
+        if kind not in self.indexes:
+            self.indexes[kind] = INDEX_LOADERS[kind](self.path, self.grid)
+        return self.indexes[kind]
+
+
+def _signature(path):
+    """Size and mtime of a maze file and, for a CSV, of its separate terrain layer."""
+    signature = maze_signature(path)
+    costs_path = costs_path_for(path)
+    if not path.endswith(".maze") and os.path.exists(costs_path):
+        signature += maze_signature(costs_path)
+    return signature
+
+
+class MazeCache:
+    """Parsed mazes by file name, least recently used first."""
+
+    def __init__(self, root, max_mazes=MAX_MAZES):
+        self.root = os.path.realpath(root)
+        self.max_mazes = max_mazes
+        self.entries = OrderedDict()
+
+    def resolve(self, name):
+        if not isinstance(name, str) or not name:
+            raise HTTPError(400, "'maze' must be a file name")
+        path = os.path.realpath(os.path.join(self.root, name))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise HTTPError(403, f"{name} is outside the maze directory")
+        return path
+
+    def get(self, name):
+        path = self.resolve(name)
+        try:
+            signature = _signature(path)
+        except OSError:
+            raise HTTPError(404, f"no maze named {name}")
+        entry = self.entries.get(path)
+        if entry is None or entry.signature != signature:
+            grid = read_grid(path)
+            try:
+                costs = read_costs(path, grid.shape)
+            except ValueError as error:
+                raise HTTPError(400, f"bad terrain layer for {name}: {error}")
+            entry = MazeEntry(grid, signature, costs, path)
+        self._remember(path, entry)
+        return entry
+
+    def put(self, name, grid, overwrite=False):
+        if (not isinstance(name, str) or os.path.basename(name) != name or name.startswith((".", COSTS_PREFIX))
+                or not name.endswith(MAZE_SUFFIXES)):
+            raise HTTPError(400, "'name' must be a plain *.csv or *.maze file name")
+        path = self.resolve(name)
+        if os.path.exists(path) and not overwrite:
+            raise HTTPError(409, f"{name} already exists; pass \"overwrite\": true to replace it")
+        try:
+            if path.endswith(".maze"):
+                write_grid_to_maze(path, grid)
+            else:
+                write_grid_to_csv(path, grid)
+            entry = MazeEntry(grid, _signature(path), read_costs(path, grid.shape), path)
+        except OSError as error:
+            raise HTTPError(400, f"could not save {name}: {error.strerror or error}")
+        except ValueError as error:  # a terrain layer left over from the file that was replaced
+            raise HTTPError(400, f"bad terrain layer for {name}: {error}")
+        self._remember(path, entry)
+
+    def _remember(self, path, entry):
+        self.entries[path] = entry
+        self.entries.move_to_end(path)
+        while len(self.entries) > self.max_mazes:
+            self.entries.popitem(last=False)
+
+    def names(self):
+        return sorted(name for name in os.listdir(self.root) if name.endswith(MAZE_SUFFIXES))
+
+
+def _cell(value, name):
+    if (not isinstance(value, (list, tuple)) or len(value) != 2
+            or not all(isinstance(v, int) and not isinstance(v, bool) for v in value)):
+        raise HTTPError(400, f"'{name}' must be [row, col]")
+    return tuple(value)
+
+
+def _open_cell(grid, cell, name):
+    rows, cols = grid.shape
+    if not (0 <= cell[0] < rows and 0 <= cell[1] < cols) or grid[cell] == solver_core.WALL:
+        raise HTTPError(400, f"'{name}' {list(cell)} is not an open cell")
+    return cell
+
+
+def solve_request(cache, request):
+    entry = cache.get(request.get("maze"))
+    start = _cell(request["start"], "start") if "start" in request else entry.start
+    goal = _cell(request["goal"], "goal") if "goal" in request else entry.goal
+    if start is None or goal is None:
+        raise HTTPError(400, "Start or goal not found in the grid!")
+    _open_cell(entry.grid, start, "start")
+    _open_cell(entry.grid, goal, "goal")
+
+    algorithm = request.get("algorithm", "cached")
+    began = time.perf_counter()
+    if algorithm == "cached":
+        misses = entry.service.stats["misses"]
+        path = entry.service.shortest_path(start, goal)
+        stats = {"path_length": len(path) if path else 0, "cache_hit": entry.service.stats["misses"] == misses}
+    elif algorithm in INDEX_LOADERS:
+        path, stats = entry.index(algorithm).shortest_path(start, goal)
+    elif algorithm in solver_core.SOLVERS:
+        solver = solver_core.SOLVERS[algorithm]
+        try:
+            if algorithm in solver_core.WEIGHTED_SOLVERS:
+                path, stats = solver(entry.grid, start, goal, costs=entry.costs)
+            else:
+                path, stats = solver(entry.grid, start, goal)
+        except ValueError as error:  # a terrain layer that does not fit the maze
+            raise HTTPError(400, str(error))
+    else:
+        raise HTTPError(400, f"unknown algorithm {algorithm!r}")
+    return {
+        "start": list(start),
+        "goal": list(goal),
+        "path": [list(cell) for cell in path] if path else None,
+        "stats": stats,
+        "search_ms": round((time.perf_counter() - began) * 1000, 3),
+    }
+
+
+def generate_request(cache, request):
+    try:
+        rows, cols = int(request["rows"]), int(request["cols"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPError(400, "'rows' and 'cols' are required integers")
+    if rows < 1 or cols < 1 or rows * cols > MAX_GENERATED_CELLS:
+        raise HTTPError(400, f"maze size must be between 1 and {MAX_GENERATED_CELLS} cells")
+
+    try:
+        density = float(request.get("density", 0.15))
+    except (TypeError, ValueError):
+        density = None
+    if density is None or not 0 <= density <= 1:  # also rejects NaN
+        raise HTTPError(400, "'density' must be a number between 0 and 1")
+
+    seed = request.get("seed")
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+        raise HTTPError(400, "'seed' must be a non-negative integer")
+
+    generator = request.get("generator", DEFAULT_GENERATOR)
+    if not isinstance(generator, str) or generator not in FAST_GENERATORS:
+        raise HTTPError(400, f"'generator' must be one of {', '.join(sorted(FAST_GENERATORS))}")
+
+    rng = np.random.default_rng(seed)
+    start = (0, 0)
+    goal = ((rows - 1) // 2 * 2, (cols - 1) // 2 * 2)  # bottom-right lattice cell
+    if goal == start:
+        raise HTTPError(400, "maze needs at least 3 rows or 3 columns so start and goal differ")
+    overwrite = request.get("overwrite", False)
+    if not isinstance(overwrite, bool):
+        raise HTTPError(400, "'overwrite' must be true or false")
+    grid = FAST_GENERATORS[generator]((rows, cols), start, rng=rng)
+    add_redundant_paths_fast(grid, density, rng=rng)
+    grid[start] = 2
+    grid[goal] = 3
+
+    response = {"rows": rows, "cols": cols, "start": list(start), "goal": list(goal)}
+    if request.get("name"):
+        cache.put(request["name"], grid, overwrite)
+        response["maze"] = request["name"]
+    else:
+        response["grid"] = ["".join(map(str, row)) for row in grid.tolist()]
+    return response
+
+
+class MazeServer:
+    def __init__(self, root, max_mazes=MAX_MAZES):
+        self.cache = MazeCache(root, max_mazes)
+        self.executor = ThreadPoolExecutor(max_workers=1)  # also serialises access to the caches
+        self.routes = {
+            ("GET", "/health"): lambda request: {"status": "ok", "mazes_cached": len(self.cache.entries)},
+            ("GET", "/mazes"): lambda request: {"mazes": self.cache.names()},
+            ("POST", "/solve"): lambda request: solve_request(self.cache, request),
+            ("POST", "/generate"): lambda request: generate_request(self.cache, request),
+        }
+
+    async def dispatch(self, method, target, body):
+        path = target.split("?", 1)[0]
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                raise HTTPError(405, f"{method} not allowed on {path}")
+            raise HTTPError(404, f"no endpoint {path}")
+        try:
+            request = json.loads(body) if body.strip() else {}
+        except ValueError:
+            raise HTTPError(400, "request body is not valid JSON")
+        if not isinstance(request, dict):
+            raise HTTPError(400, "request body must be a JSON object")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, handler, request)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    keep_alive = keep_alive and version == "HTTP/1.1"
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY:
+                        keep_alive = False
+                        raise HTTPError(413, f"request body is limited to {MAX_BODY} bytes")
+                    body = await reader.readexactly(length) if length > 0 else b""
+                    status, payload = 200, await self.dispatch(method, target, body)
+                except HTTPError as error:
+                    status, payload = error.status, {"error": str(error)}
+                except ValueError:
+                    status, payload, keep_alive = 400, {"error": "malformed request"}, False
+                except Exception as error:  # keep serving after a bug in one request
+                    status, payload = 500, {"error": f"{type(error).__name__}: {error}"}
+
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host=HOST, port=PORT, unix_path=None):
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, unix_path)
+            print(f"Serving mazes from {self.cache.root} on unix:{unix_path}")
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            print(f"Serving mazes from {self.cache.root} on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve maze solve/generate requests from a warm process.")
+    parser.add_argument("--root", default=os.path.join(BASE_DIRECTORY, "mazes_input"),
+                        help="directory that maze names are resolved against")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--max-mazes", type=int, default=MAX_MAZES, help="parsed mazes kept in memory")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(MazeServer(args.root, args.max_mazes).serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Incremental pygame rendering shared by the maze generator and solvers.
+
+``MazeView`` keeps what is currently on screen in a NumPy array.  The
+first frame draws everything; after that only cells whose value changed
+are redrawn and only their rectangles are pushed to the display with
+``pygame.display.update(rects)``.  Button labels are rendered once.
+
+``RenderScheduler`` decouples animation from the algorithm driving it:
+steps (expansions, carved cells, path cells) are batched into frames shown
+at a target frame rate, and pressing Space/Enter/Escape skips straight to
+the final state.  Unless a fixed ``steps_per_frame`` is given, the batch
+size is derived from the grid size so that no animation takes much longer
+than ``MAX_ANIMATION_SECONDS``.
+"""
+import numpy as np
+import pygame
+
+from maze_export import PALETTE
+
+WHITE = (255, 255, 255)
+BUTTON_COLOR = (200, 0, 0)
+
+FPS = 60
+STEPS_PER_FRAME = None  # None: derive from the grid size and MAX_ANIMATION_SECONDS
+MAX_ANIMATION_SECONDS = 5
+SKIP_KEYS = (pygame.K_SPACE, pygame.K_RETURN, pygame.K_ESCAPE)
+
+
+class MazeView:
+    def __init__(self, screen, cell_size, margin, buttons):
+        self.screen = screen
+        self.cell_size = cell_size
+        self.margin = margin
+        self.buttons = _as_button_list(buttons)
+        self.shown = None  # grid values currently on screen
+
+        font = pygame.font.Font(None, 24)
+        self.labels = [font.render(label, True, WHITE) for _, label in self.buttons]
+
+    def cell_rect(self, row, col):
+        step = self.cell_size + self.margin
+        return pygame.Rect(col * step, row * step, self.cell_size, self.cell_size)
+
+    def _draw_cell(self, row, col, value):
+        color = PALETTE[value] if value < len(PALETTE) else PALETTE[0]
+        return pygame.draw.rect(self.screen, color, self.cell_rect(row, col))
+
+    def redraw(self, grid):
+        """Draw the whole maze and the buttons, then flip the display."""
+        grid = np.asarray(grid)
+        self.screen.fill(WHITE)
+        for row, col in np.ndindex(grid.shape):
+            self._draw_cell(row, col, int(grid[row, col]))
+        for (rect, _), label in zip(self.buttons, self.labels):
+            pygame.draw.rect(self.screen, BUTTON_COLOR, rect)
+            self.screen.blit(label, label.get_rect(center=rect.center))
+        pygame.display.flip()
+        self.shown = grid.copy()
+
+    def draw(self, grid, cells=None):
+        """Bring the screen up to date with ``grid``.
+
+        ``cells`` lists the (row, col) cells that may have changed; without
+        it the view diffs the grid against what it last drew.
+        """
+        grid = np.asarray(grid)
+        if self.shown is None or self.shown.shape != grid.shape:
+            self.redraw(grid)
+            return
+        if cells is None:
+            cells = np.argwhere(grid != self.shown).tolist()
+
+        rects = []
+        for row, col in cells:
+            value = int(grid[row, col])
+            if self.shown[row, col] != value:
+                self.shown[row, col] = value
+                rects.append(self._draw_cell(row, col, value))
+        if rects:
+            pygame.display.update(rects)
+
+    def invalidate(self):
+        """Force a full redraw on the next ``draw`` (e.g. after the window was exposed)."""
+        self.shown = None
+
+
+class RenderScheduler:
+    def __init__(self, view, grid, quit_rect=None, fps=None, steps_per_frame=None, max_seconds=None):
+        self.view = view
+        self.grid = grid
+        self.quit_rect = quit_rect
+        self.fps = fps or FPS
+        steps_per_frame = steps_per_frame or STEPS_PER_FRAME
+        if steps_per_frame is None:
+            frames = self.fps * (max_seconds or MAX_ANIMATION_SECONDS)
+            steps_per_frame = max(1, -(-np.size(grid) // frames))
+        self.steps_per_frame = steps_per_frame
+        self.clock = pygame.time.Clock()
+        self.pending = []
+        self.steps = 0
+        self.skipping = False
+
+    def step(self, cells):
+        """Record one animation step that changed ``cells``; shows a frame every N steps."""
+        self.steps += 1
+        if not self.skipping:
+            self.pending.extend(cells)
+        if self.steps % self.steps_per_frame == 0:
+            self.frame()
+
+    def frame(self):
+        self.handle_events()
+        if self.skipping:
+            return
+        self.view.draw(self.grid, self.pending)
+        self.pending = []
+        self.clock.tick(self.fps)
+
+    def finish(self):
+        """Show the final state, including anything skipped."""
+        self.handle_events()
+        self.view.draw(self.grid, None if self.skipping else self.pending)
+        self.pending = []
+
+    def handle_events(self):
+        for event in pygame.event.get():
+            # Leaving raises SystemExit: a standalone script ends (pygame shuts
+            # itself down at exit) and main.py returns to its menu
+            if event.type == pygame.QUIT:
+                raise SystemExit
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if self.quit_rect is not None and self.quit_rect.collidepoint(event.pos):
+                    raise SystemExit
+            if event.type == pygame.KEYDOWN and event.key in SKIP_KEYS:
+                self.skipping = True
+
+
+def _as_button_list(buttons):
+    # The solvers pass a single quit rect, the generator a list of (rect, label)
+    if isinstance(buttons, pygame.Rect):
+        return [(buttons, "QUIT")]
+    return list(buttons)
+
+
+_view = None
+
+
+def get_view(screen, CELL_SIZE, MARGIN, buttons):
+    """Return the view for ``screen``, creating it on first use."""
+    global _view
+    if (_view is None or _view.screen is not screen or _view.cell_size != CELL_SIZE
+            or _view.margin != MARGIN or _view.buttons != _as_button_list(buttons)):
+        _view = MazeView(screen, CELL_SIZE, MARGIN, buttons)
+    return _view
+
+
+def reset_view():
+    """Forget the cached view, e.g. after another screen drew over the window."""
+    global _view
+    _view = None
+
+
+def display_maze(grid, screen, CELL_SIZE, MARGIN, buttons, cells=None):
+    get_view(screen, CELL_SIZE, MARGIN, buttons).draw(grid, cells)
+
+
+def make_scheduler(grid, screen, CELL_SIZE, MARGIN, buttons, quit_rect=None, **options):
+    """A ``RenderScheduler`` drawing ``grid`` on the shared view for ``screen``."""
+    view = get_view(screen, CELL_SIZE, MARGIN, buttons)
+    return RenderScheduler(view, grid, quit_rect, **options)
@@ -0,0 +1,213 @@
+"""Whole-maze BFS distance fields computed on all cores.
+
+``solver_core.distance_field`` labels a maze on one core.  For very large
+mazes ``parallel_distance_field`` tiles the grid and hands tiles to a
+process pool; the grid and the distance array live in
+``multiprocessing.shared_memory`` so workers read and write them in place.
+
+Each task relaxes one tile: a level-synchronous multi-source BFS seeded
+with the finite distances in the one-cell ring around it (and any sources
+inside it), so revisiting a tile costs what actually changed.
+A tile whose border cells improved wakes up the neighbouring tile on that
+side for the next round, and rounds repeat until no tile changes.  Values
+only ever decrease and each one is the length of a real path, so reading
+a neighbour's border while it is being rewritten is harmless, and the
+fixed point is the exact BFS distance field.
+
+Example:
+    python parallel_field.py mazes_input/maze_1.csv --workers 8 --output dist.npy
+"""
+import argparse
+import bisect
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import solver_core
+from maze_io import read_grid
+
+TILE_SIZE = 512
+UNREACHED = np.iinfo(np.int32).max
+
+_grid = None  # worker views onto the shared arrays
+_dist = None
+_segments = []
+
+
+def _attach(grid_name, dist_name, shape):
+    global _grid, _dist, _segments
+    grid_segment = shared_memory.SharedMemory(name=grid_name)
+    dist_segment = shared_memory.SharedMemory(name=dist_name)
+    _segments = [grid_segment, dist_segment]  # keep the mappings alive
+    _grid = np.ndarray(shape, dtype=np.uint8, buffer=grid_segment.buf)
+    _dist = np.ndarray(shape, dtype=np.int32, buffer=dist_segment.buf)
+
+
+def _relax_tile(bounds):
+    """Relax one tile against its surroundings; returns which borders (top, bottom, left, right) improved."""
+    top, bottom, left, right = bounds
+    rows, cols = _grid.shape
+    outer_top, outer_bottom = max(top - 1, 0), min(bottom + 1, rows)
+    outer_left, outer_right = max(left - 1, 0), min(right + 1, cols)
+    local = _dist[outer_top:outer_bottom, outer_left:outer_right].copy()
+    height, width = local.shape
+    inner = (slice(top - outer_top, bottom - outer_top), slice(left - outer_left, right - outer_left))
+    writable = np.zeros(local.shape, dtype=bool)
+    writable[inner] = _grid[top:bottom, left:right] != solver_core.WALL
+    before = local[inner].copy()
+
+    # The interior is already consistent with the ring it saw last time, so
+    # only the ring and the sources themselves (distance 0) can start changes
+    seeding = local != UNREACHED
+    seeding[inner] &= local[inner] == 0
+    flat, writable = local.reshape(-1), writable.reshape(-1)
+    size = flat.size
+    seeds = np.flatnonzero(seeding)
+    seeds = seeds[np.argsort(flat[seeds], kind="stable")]
+    seed_levels = flat[seeds].tolist()
+    owner = np.empty(size, dtype=np.int64)  # de-duplicates candidates without sorting
+    next_seed = 0
+    frontier = np.empty(0, dtype=np.int64)
+    level = 0
+    while frontier.size or next_seed < len(seeds):
+        if not frontier.size:
+            level = seed_levels[next_seed]
+        if next_seed < len(seeds) and seed_levels[next_seed] == level:
+            end = bisect.bisect_right(seed_levels, level, next_seed)
+            joining = seeds[next_seed:end]
+            next_seed = end
+            # Seeds that were improved meanwhile have already been expanded at their lower level
+            frontier = np.concatenate((frontier, joining[flat[joining] == level]))
+            if not frontier.size:
+                continue
+        col = frontier % width
+        candidates = np.concatenate((
+            frontier[col < width - 1] + 1,
+            frontier[col > 0] - 1,
+            frontier[frontier < size - width] + width,
+            frontier[frontier >= width] - width,
+        ))
+        candidates = candidates[writable[candidates]]
+        candidates = candidates[flat[candidates] > level + 1]
+        order = np.arange(candidates.size)
+        owner[candidates] = order
+        frontier = candidates[owner[candidates] == order]
+        level += 1
+        flat[frontier] = level
+
+    after = local[inner]
+    improved = after < before
+    if not improved.any():
+        return bounds, (False, False, False, False)
+    _dist[top:bottom, left:right] = after
+    return bounds, (bool(improved[0].any()), bool(improved[-1].any()),
+                    bool(improved[:, 0].any()), bool(improved[:, -1].any()))
+
+
+def _tiles(rows, cols, tile_size):
+    return {
+        (row // tile_size, col // tile_size): (row, min(row + tile_size, rows), col, min(col + tile_size, cols))
+        for row in range(0, rows, tile_size)
+        for col in range(0, cols, tile_size)
+    }
+
+
+def _converge(tiles, first, relax, tile_size):
+    """Run rounds of ``relax`` over the woken tiles until none changes; returns the round count."""
+    active, rounds = set(first), 0
+    while active:
+        rounds += 1
+        woken = set()
+        for bounds, (top, bottom, left, right) in relax([tiles[key] for key in sorted(active)]):
+            row, col = bounds[0] // tile_size, bounds[2] // tile_size
+            for changed, neighbor in ((top, (row - 1, col)), (bottom, (row + 1, col)),
+                                      (left, (row, col - 1)), (right, (row, col + 1))):
+                if changed and neighbor in tiles:
+                    woken.add(neighbor)
+        active = woken
+    return rounds
+
+
+def parallel_distance_field(grid, sources, workers=None, tile_size=None):
+    """BFS distances from ``sources`` (one (row, col) or a list of them), -1 where unreachable.
+
+    Same result as ``solver_core.distance_field`` for a single source.  Tiles
+    are ``TILE_SIZE`` cells square unless ``tile_size`` says otherwise; with
+    one worker the default is a single tile, as re-relaxing tiles only pays
+    off when they run side by side.
+    """
+    grid = solver_core.as_grid(grid)
+    rows, cols = grid.shape
+    sources = [sources] if isinstance(sources[0], (int, np.integer)) else list(sources)
+    for row, col in sources:
+        if not (0 <= row < rows and 0 <= col < cols) or grid[row, col] == solver_core.WALL:
+            raise ValueError(f"{(row, col)} is not an open cell")
+    workers = workers or os.cpu_count() or 1
+    tile_size = tile_size or (TILE_SIZE if workers > 1 else max(rows, cols, 1))
+    tiles = _tiles(rows, cols, tile_size)
+    # Source tiles, and their neighbours: a source on a tile border is news to them too
+    first = set()
+    for row, col in sources:
+        row, col = row // tile_size, col // tile_size
+        first.update(key for key in ((row, col), (row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1))
+                     if key in tiles)
+
+    global _grid, _dist
+    grid_segment = shared_memory.SharedMemory(create=True, size=max(grid.nbytes, 1))
+    dist_segment = shared_memory.SharedMemory(create=True, size=max(grid.size * 4, 1))
+    try:
+        shared_grid = np.ndarray(grid.shape, dtype=np.uint8, buffer=grid_segment.buf)
+        shared_grid[:] = grid
+        dist = np.ndarray(grid.shape, dtype=np.int32, buffer=dist_segment.buf)
+        dist.fill(UNREACHED)
+        for cell in sources:
+            dist[cell] = 0
+
+        if workers == 1 or len(tiles) == 1:
+            _grid, _dist = shared_grid, dist
+            try:
+                _converge(tiles, first, lambda batch: map(_relax_tile, batch), tile_size)
+            finally:
+                _grid, _dist = None, None
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                     initargs=(grid_segment.name, dist_segment.name, grid.shape)) as executor:
+                _converge(tiles, first, lambda batch: executor.map(
+                    _relax_tile, batch, chunksize=max(1, len(batch) // (workers * 4))), tile_size)
+
+        result = dist.copy()
+        del shared_grid, dist
+    finally:
+        grid_segment.close()
+        grid_segment.unlink()
+        dist_segment.close()
+        dist_segment.unlink()
+    result[result == UNREACHED] = -1
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute a maze's BFS distance field on all cores.")
+    parser.add_argument("maze", help="maze file (.csv or .maze)")
+    parser.add_argument("--source", type=int, nargs=2, action="append", metavar=("ROW", "COL"),
+                        help="source cell (repeatable, default: the start cell)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--tile-size", type=int, default=None, help=f"tile side in cells (default: {TILE_SIZE})")
+    parser.add_argument("--output", help="save the field as a .npy file")
+    args = parser.parse_args(argv)
+
+    grid = read_grid(args.maze)
+    sources = [tuple(cell) for cell in args.source] if args.source else [solver_core.find_start_goal(grid)[0]]
+    if sources[0] is None:
+        parser.error("Start or goal not found in the grid!")
+    dist = parallel_distance_field(grid, sources, args.workers, args.tile_size)
+    reached = dist >= 0
+    print(f"{int(reached.sum())} cells reached, farthest at distance {int(dist.max())}")
+    if args.output:
+        np.save(args.output, dist)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Answer many path queries against one maze.
+
+A ``PathService`` loads a maze once and keeps single-source BFS distance
+fields (``solver_core.distance_field``) in an LRU cache keyed by source
+cell.  Moves are symmetric, so a field from either endpoint answers a
+query: the distance is a lookup and the path a downhill walk of path-length
+steps.  A full search only runs for a pair whose endpoints have no field
+yet, and that field is then kept for the next queries.  Fields cost 4 bytes
+per cell; the least recently used ones are dropped once the cache exceeds
+``memory_budget`` bytes.
+
+Example:
+    python path_service.py mazes_input/maze_1.csv < queries.txt
+
+where each line of ``queries.txt`` is ``start_row start_col goal_row goal_col``.
+"""
+import argparse
+import sys
+from collections import OrderedDict
+
+import solver_core
+from maze_io import read_grid
+
+MEMORY_BUDGET = 256 * 1024 * 1024
+
+
+class PathService:
+    def __init__(self, grid, memory_budget=MEMORY_BUDGET):
+        self.grid = solver_core.as_grid(grid)
+        self.memory_budget = memory_budget
+        self.fields = OrderedDict()  # source -> distance field, least recently used first
+        self.memory_used = 0
+        self.stats = {"queries": 0, "hits": 0, "misses": 0, "evictions": 0}
+
+    @classmethod
+    def from_file(cls, file_path, memory_budget=MEMORY_BUDGET):
+        return cls(read_grid(file_path), memory_budget)
+
+    def _check(self, cell):
+        rows, cols = self.grid.shape
+        if not (0 <= cell[0] < rows and 0 <= cell[1] < cols) or self.grid[cell] == solver_core.WALL:
+            raise ValueError(f"{cell} is not an open cell")
+
+    def _cached(self, source):
+        dist = self.fields.get(source)
+        if dist is not None:
+            self.fields.move_to_end(source)
+        return dist
+
+    def field(self, source):
+        """The distance field from ``source``, computed and cached on first use."""
+        dist = self._cached(source)
+        if dist is not None:
+            return dist
+        self._check(source)
+        dist = solver_core.distance_field(self.grid, source)
+        self.fields[source] = dist
+        self.memory_used += dist.nbytes
+        while self.memory_used > self.memory_budget and len(self.fields) > 1:
+            _, evicted = self.fields.popitem(last=False)
+            self.memory_used -= evicted.nbytes
+            self.stats["evictions"] += 1
+        return dist
+
+    def _field_for(self, start, goal):
+        """A field rooted at either endpoint and whether it is rooted at ``goal``."""
+        self.stats["queries"] += 1
+        for source, reverse in ((start, False), (goal, True)):
+            dist = self._cached(source)
+            if dist is not None:
+                self.stats["hits"] += 1
+                return dist, reverse
+        self.stats["misses"] += 1
+        return self.field(start), False
+
+    def distance(self, start, goal):
+        """Number of moves between two open cells, or -1 if they are not connected."""
+        dist, reverse = self._field_for(start, goal)
+        self._check(start if reverse else goal)
+        return int(dist[start if reverse else goal])
+
+    def shortest_path(self, start, goal):
+        """Shortest path as a list of (row, col) from ``start`` to ``goal``, or None."""
+        dist, reverse = self._field_for(start, goal)
+        self._check(start if reverse else goal)
+        path = solver_core.path_from_distance_field(dist, start if reverse else goal)
+        if path and reverse:
+            path.reverse()
+        return path
+
+    def shortest_paths(self, pairs):
+        """Answer a batch of (start, goal) pairs, grouped so each shared endpoint is searched once."""
+        pairs = list(pairs)
+        counts = {}
+        for start, goal in pairs:
+            counts[start] = counts.get(start, 0) + 1
+            counts[goal] = counts.get(goal, 0) + 1
+        # Root each query at its more shared endpoint and serve one root at a time
+        roots = [goal if counts[goal] > counts[start] else start for start, goal in pairs]
+        results = [None] * len(pairs)
+        for i in sorted(range(len(pairs)), key=lambda i: roots[i]):
+            start, goal = pairs[i]
+            if roots[i] == start:
+                results[i] = self.shortest_path(start, goal)
+            else:
+                path = self.shortest_path(goal, start)
+                results[i] = path[::-1] if path else path
+        return results
+
+
+def _parse_query(line):
+    values = [int(value) for value in line.replace(",", " ").split()]
+    if len(values) != 4:
+        raise ValueError(f"expected 'start_row start_col goal_row goal_col', got {line.strip()!r}")
+    return (values[0], values[1]), (values[2], values[3])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Answer shortest-path queries against one maze.")
+    parser.add_argument("maze", help="maze file (.csv or .maze)")
+    parser.add_argument("--paths", action="store_true", help="print the cells of each path, not just its length")
+    parser.add_argument("--memory", type=float, default=MEMORY_BUDGET / 2 ** 20,
+                        help="distance-field cache budget in MiB (default: %(default)d)")
+    args = parser.parse_args(argv)
+
+    service = PathService.from_file(args.maze, int(args.memory * 2 ** 20))
+    try:
+        pairs = [_parse_query(line) for line in sys.stdin if line.strip()]
+        paths = service.shortest_paths(pairs)
+    except ValueError as error:
+        parser.error(str(error))
+    for (start, goal), path in zip(pairs, paths):
+        if path is None:
+            print(f"{start} -> {goal}: no path")
+        elif args.paths:
+            print(" ".join(f"{row},{col}" for row, col in path))
+        else:
+            print(f"{start} -> {goal}: {len(path) - 1}")
+    print(f"{service.stats['queries']} queries, {service.stats['misses']} searches, "
+          f"{service.stats['evictions']} evictions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Structured metrics for one solve: search counters, phase timings, memory.
+
+The solver front ends (bfs.py, dfs.py, aStar.py) and batch_solve.py fill in
+a ``SolveMetrics`` per maze.  It keeps the ``stats`` dict the solvers in
+solver_core return (nodes expanded, frontier peak, pushes/pops, path
+length) next to wall-clock seconds per phase:
+
+* ``search`` - the solver itself, minus any time spent in its callbacks,
+* ``render`` - pygame drawing driven from ``on_expand`` and the path replay,
+* ``io``     - reading the maze and writing the solved CSV (and PNG),
+* ``pdf``    - ``write_grid_to_pdf``.
+
+Phases nest: time spent in an inner phase is not counted again in the outer
+one, so the phases add up to the total.
+
+Two environment variables switch on more, so the same settings reach runs
+started from the command line, from batch_solve and from the main.py
+launcher:
+
+* ``MAZE_METRICS_LOG=path`` appends every solve's metrics to ``path`` as
+  one JSON object per line.
+* ``MAZE_PROFILE=cpu,memory`` runs the solve under cProfile and/or
+  tracemalloc and prints the top entries to stderr.  Both slow the solve
+  down, so the timings of a profiled run are not comparable with
+  unprofiled ones.
+
+Memory comes in two flavours.  ``peak_traced_bytes`` is the peak of this
+solve alone: tracemalloc's peak is reset when the solve starts.  It is only
+recorded with ``MAZE_PROFILE=memory``, which batch_solve's workers honour
+too (without printing the report).  ``process_peak_rss_bytes`` is always
+recorded where the OS reports it, but it is the high-water mark of the
+whole process: a batch worker reports the largest solve it has done so far,
+not the current one.
+
+Example:
+    MAZE_METRICS_LOG=solves.jsonl MAZE_PROFILE=cpu python bfs.py --headless
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+PHASES = ("search", "render", "io", "pdf")
+METRICS_LOG_ENV = "MAZE_METRICS_LOG"
+PROFILE_ENV = "MAZE_PROFILE"
+PROFILE_TOP = 20  # entries printed by the profiling hooks
+
+
+def append_json_line(file_path, record):
+    with open(file_path, "a") as file:
+        file.write(json.dumps(record) + "\n")
+
+
+def process_peak_rss_bytes():
+    """Peak resident set size of this process so far (cumulative), or None where it cannot be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports kilobytes
+
+
+class SolveMetrics:
+    def __init__(self, algorithm, maze=None):
+        self.algorithm = algorithm
+        self.maze = maze
+        self.stats = {}
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.extra = {}  # peak memory and anything else recorded outside the phases
+        self._nested = []  # time spent in inner phases, per open phase
+        self._tracing = False
+
+    @contextmanager
+    def phase(self, name):
+        """Add the time spent inside the block to ``name`` (inner phases excluded)."""
+        started = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - started
+            self.seconds[name] += elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def timed(self, callback, name="render"):
+        """Wrap ``callback`` (an ``on_expand`` for instance) so its calls count towards ``name``."""
+        def wrapper(*args):
+            with self.phase(name):
+                return callback(*args)
+        return wrapper
+
+    def start_memory_trace(self):
+        """Start measuring this solve's ``peak_traced_bytes``; returns True if tracemalloc was started here."""
+        import tracemalloc
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._tracing = True
+        return started
+
+    def record_peak_memory(self):
+        if self._tracing:
+            import tracemalloc
+            self.extra["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        peak = process_peak_rss_bytes()
+        if peak is not None:
+            self.extra["process_peak_rss_bytes"] = peak
+
+    def record(self, result):
+        """Keep the stats of a solver's ``(path, stats)`` result; returns the result unchanged."""
+        self.stats.update(result[1])
+        return result
+
+    def as_dict(self):
+        result = {"algorithm": self.algorithm, "maze": self.maze, "timestamp": time.time()}
+        result.update(self.stats)
+        for name, seconds in self.seconds.items():
+            result[f"{name}_seconds"] = round(seconds, 6)
+        result["total_seconds"] = round(sum(self.seconds.values()), 6)
+        result.update(self.extra)
+        return result
+
+    def summary(self):
+        stats = self.stats
+        counters = f"expanded {stats.get('nodes_expanded', 0)}, path {stats.get('path_length', 0)}"
+        if "frontier_peak" in stats:
+            counters += f", frontier peak {stats['frontier_peak']}"
+        timings = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.seconds.items() if seconds)
+        return f"{self.algorithm}: {counters} ({timings or 'no timings'})"
+
+    def log(self, file_path):
+        """Append the metrics to a JSON-lines file."""
+        append_json_line(file_path, self.as_dict())
+
+
+def profile_modes():
+    """The hooks requested through ``MAZE_PROFILE`` ("cpu", "memory")."""
+    return {mode.strip() for mode in os.environ.get(PROFILE_ENV, "").split(",") if mode.strip()}
+
+
+@contextmanager
+def instrument(algorithm, maze=None):
+    """Collect ``SolveMetrics`` for the block, with the opt-in log and profiling hooks.
+
+    On exit the peak memory is recorded, the hooks print their reports and
+    the metrics are appended to ``MAZE_METRICS_LOG`` if it is set.
+    """
+    metrics = SolveMetrics(algorithm, maze)
+    modes = profile_modes()
+    profiler = None
+    if "cpu" in modes:
+        import cProfile
+        profiler = cProfile.Profile()
+    tracing = "memory" in modes
+    if tracing:
+        started_tracing = metrics.start_memory_trace()
+
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield metrics
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        metrics.record_peak_memory()
+        if tracing:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+            print(f"tracemalloc: top {PROFILE_TOP} allocation sites still held", file=sys.stderr)
+            for line in snapshot.statistics("lineno")[:PROFILE_TOP]:
+                print(f"  {line}", file=sys.stderr)
+        if profiler is not None:
+            import pstats
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        log_path = os.environ.get(METRICS_LOG_ENV)
+        if log_path:
+            try:
+                metrics.log(log_path)
+            except OSError as error:
+                print(f"Could not write metrics to {log_path}: {error}", file=sys.stderr)
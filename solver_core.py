@@ -0,0 +1,739 @@
+"""Headless maze search engines shared by the BFS, DFS and A* front ends.
+
+Nothing in this module imports pygame or reportlab: a solver takes a grid
+plus the start and goal cells and returns ``(path, stats)``.  The pygame
+visualizers animate a search by passing an ``on_expand`` callback, which is
+called with every cell the search expands.
+
+Searches run on a contiguous ``uint8`` NumPy grid addressed by flat index
+(``row * cols + col``).  Parents and distances live in ``int32`` arrays and
+visited flags in a bitset, so a cell costs a few bytes instead of the
+hundreds a dict/set of tuples needs.  Scalar access in the inner loops goes
+through ``memoryview`` objects, which is much cheaper than indexing NumPy
+arrays element by element.
+"""
+import heapq
+from collections import deque
+
+import numpy as np
+
+# Cell values used in the maze CSV files
+WALL = 0
+PATH = 1
+START = 2
+GOAL = 3
+FINAL_PATH = 4
+EXPLORED = 5
+
+DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]  # 4 possible movements
+
+
+def as_grid(grid):
+    """Return ``grid`` as a contiguous 2-D uint8 array (no copy if it already is one)."""
+    return np.ascontiguousarray(grid, dtype=np.uint8)
+
+
+# Find the start (2) and goal (3) positions in the grid
+def find_start_goal(grid):
+    grid = as_grid(grid)
+    start, goal = None, None
+    starts = np.argwhere(grid == START)
+    goals = np.argwhere(grid == GOAL)
+    if len(starts):
+        start = tuple(int(v) for v in starts[-1])
+    if len(goals):
+        goal = tuple(int(v) for v in goals[-1])
+    return start, goal
+
+
+# Heuristic function (Manhattan distance)
+def heuristic(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def new_bitset(size):
+    return np.zeros((size + 7) >> 3, dtype=np.uint8)
+
+
+def reconstruct_path(parent, current, cols):
+    """Walk a flat-index parent array back from ``current`` to the root."""
+    path = []
+    while current != -1:
+        path.append(divmod(current, cols))
+        current = parent[current]
+    return path[::-1]
+
+
+def open_neighbors(cells, index, cols, size):
+    # Same order as DIRECTIONS: right, left, down, up
+    neighbors = []
+    col = index % cols
+    if col < cols - 1 and cells[index + 1] != WALL:
+        neighbors.append(index + 1)
+    if col > 0 and cells[index - 1] != WALL:
+        neighbors.append(index - 1)
+    if index + cols < size and cells[index + cols] != WALL:
+        neighbors.append(index + cols)
+    if index >= cols and cells[index - cols] != WALL:
+        neighbors.append(index - cols)
+    return neighbors
+
+
+def _prepare(grid):
+    grid = as_grid(grid)
+    rows, cols = grid.shape
+    return memoryview(grid.reshape(-1)), cols, rows * cols
+
+
+def bfs(grid, start, goal, on_expand=None):
+    cells, cols, size = _prepare(grid)
+    source = start[0] * cols + start[1]
+    target = goal[0] * cols + goal[1]
+    parent_array = np.full(size, -1, dtype=np.int32)
+    parent = memoryview(parent_array)
+    seen = memoryview(new_bitset(size))
+    seen[source >> 3] |= 1 << (source & 7)
+    queue = deque([source])
+    frontier_peak = 1
+    stats = {"nodes_expanded": 0, "path_length": 0}
+
+    while queue:
+        current = queue.popleft()
+        stats["nodes_expanded"] += 1
+        if on_expand is not None:
+            on_expand(divmod(current, cols))
+
+        if current == target:
+            path = reconstruct_path(parent, current, cols)
+            stats["path_length"] = len(path)
+            break
+
+        for neighbor in open_neighbors(cells, current, cols, size):
+            if not seen[neighbor >> 3] >> (neighbor & 7) & 1:
+                seen[neighbor >> 3] |= 1 << (neighbor & 7)
+                parent[neighbor] = current
+                queue.append(neighbor)
+        if len(queue) > frontier_peak:
+            frontier_peak = len(queue)
+    else:
+        path = None
+
+    # Every cell is queued once and popped once when expanded
+    stats.update(frontier_pops=stats["nodes_expanded"], frontier_pushes=stats["nodes_expanded"] + len(queue),
+                 frontier_peak=frontier_peak)
+    return path, stats
+
+
+def _next_level(frontier, unvisited, cols, size):
+    """The unvisited open neighbours of ``frontier`` and their parents, in the order ``bfs`` queues them.
+
+    Candidates are laid out by frontier position, then in DIRECTIONS order,
+    and only the first occurrence of a cell is kept, which is the neighbour
+    that discovers it in the scalar loop.
+    """
+    col = frontier % cols
+    candidates = np.stack((
+        np.where(col < cols - 1, frontier + 1, -1),
+        np.where(col > 0, frontier - 1, -1),
+        np.where(frontier < size - cols, frontier + cols, -1),
+        np.where(frontier >= cols, frontier - cols, -1),
+    ), axis=1).reshape(-1)
+    keep = candidates >= 0
+    keep[keep] = unvisited[candidates[keep]]
+    positions = np.flatnonzero(keep)
+    _, first = np.unique(candidates[positions], return_index=True)
+    positions = positions[np.sort(first)]
+    return candidates[positions], frontier[positions // 4]
+
+
+def distance_field(grid, source, target=None):
+    """Level-synchronous BFS distances from ``source`` (-1 where unreachable).
+
+    The whole frontier is expanded per step: it is kept as an array of flat
+    indices, and its neighbours are produced with vectorised shifts and
+    filtered against a mask of unvisited open cells.  If ``target`` is given,
+    the search stops as soon as that cell is labelled.
+    """
+    grid = as_grid(grid)
+    rows, cols = grid.shape
+    size = rows * cols
+    unvisited = (grid != WALL).reshape(-1)
+    dist = np.full(size, -1, dtype=np.int32)
+    source = source[0] * cols + source[1]
+    target = -1 if target is None else target[0] * cols + target[1]
+    frontier = np.array([source], dtype=np.int64)
+    unvisited[source] = False
+    dist[source] = 0
+    level = 0
+
+    while frontier.size:
+        if target != -1 and dist[target] != -1:
+            break
+        frontier, _ = _next_level(frontier, unvisited, cols, size)
+        level += 1
+        unvisited[frontier] = False
+        dist[frontier] = level
+
+    return dist.reshape(rows, cols)
+
+
+def path_from_distance_field(dist, goal):
+    """Walk downhill through a BFS distance field from ``goal`` back to its source."""
+    rows, cols = dist.shape
+    if dist[goal] == -1:
+        return None
+    flat = memoryview(np.ascontiguousarray(dist).reshape(-1))
+    current = goal[0] * cols + goal[1]
+    path = [goal]
+    while flat[current] > 0:
+        wanted = flat[current] - 1
+        col = current % cols
+        if col < cols - 1 and flat[current + 1] == wanted:
+            current += 1
+        elif col > 0 and flat[current - 1] == wanted:
+            current -= 1
+        elif current + cols < rows * cols and flat[current + cols] == wanted:
+            current += cols
+        else:
+            current -= cols
+        path.append(divmod(current, cols))
+    return path[::-1]
+
+
+def bfs_vectorized(grid, start, goal, on_expand=None):
+    """Frontier-at-a-time BFS returning the same path as ``bfs`` at array speed.
+
+    Each level is kept in the order ``bfs`` queues it, and every new cell
+    records the neighbour that discovered it first, so the parent tree, the
+    path, ``nodes_expanded`` and the ``on_expand`` order are exactly those
+    of the scalar loop.  The queue counters ``bfs`` adds are not reported.
+    """
+    grid = as_grid(grid)
+    rows, cols = grid.shape
+    size = rows * cols
+    unvisited = (grid != WALL).reshape(-1)
+    parent_array = np.full(size, -1, dtype=np.int32)
+    source = start[0] * cols + start[1]
+    target = goal[0] * cols + goal[1]
+    frontier = np.array([source], dtype=np.int64)
+    unvisited[source] = False
+    stats = {"nodes_expanded": 0, "path_length": 0}
+
+    while frontier.size:
+        found = np.flatnonzero(frontier == target)
+        if found.size:
+            frontier = frontier[:found[0] + 1]  # bfs stops once it pops the goal
+        stats["nodes_expanded"] += frontier.size
+        if on_expand is not None:
+            for index in frontier.tolist():
+                on_expand(divmod(index, cols))
+        if found.size:
+            path = reconstruct_path(memoryview(parent_array), target, cols)
+            stats["path_length"] = len(path)
+            return path, stats
+        frontier, parents = _next_level(frontier, unvisited, cols, size)
+        unvisited[frontier] = False
+        parent_array[frontier] = parents
+
+    return None, stats
+
+
+def dfs(grid, start, goal, on_expand=None):
+    cells, cols, size = _prepare(grid)
+    source = start[0] * cols + start[1]
+    target = goal[0] * cols + goal[1]
+    parent_array = np.full(size, -1, dtype=np.int32)
+    parent = memoryview(parent_array)
+    visited = memoryview(new_bitset(size))
+    stack = [source]
+    pops = 0
+    frontier_peak = 1
+    stats = {"nodes_expanded": 0, "path_length": 0}
+
+    while stack:
+        current = stack.pop()
+        pops += 1
+        if visited[current >> 3] >> (current & 7) & 1:
+            continue
+        visited[current >> 3] |= 1 << (current & 7)
+        stats["nodes_expanded"] += 1
+        if on_expand is not None:
+            on_expand(divmod(current, cols))
+
+        if current == target:
+            path = reconstruct_path(parent, current, cols)
+            stats["path_length"] = len(path)
+            break
+
+        for neighbor in open_neighbors(cells, current, cols, size):
+            if not visited[neighbor >> 3] >> (neighbor & 7) & 1:
+                parent[neighbor] = current
+                stack.append(neighbor)
+        if len(stack) > frontier_peak:
+            frontier_peak = len(stack)
+    else:
+        path = None
+
+    # A cell can be pushed again before it is expanded; the extra copies are skipped on pop
+    stats.update(frontier_pops=pops, frontier_pushes=pops + len(stack), frontier_peak=frontier_peak)
+    return path, stats
+
+
+def a_star(grid, start, goal, on_expand=None):
+    """A* with Manhattan heuristic.
+
+    Heap entries are ``(f, -g, node)`` so equal-f ties go to the deeper node,
+    which heads straight for the goal across open areas.  Improved nodes are
+    pushed again rather than decreased in place; the stale copies are
+    skipped on pop by comparing their g against the current best.
+    """
+    cells, cols, size = _prepare(grid)
+    source = start[0] * cols + start[1]
+    target = goal[0] * cols + goal[1]
+    goal_row, goal_col = goal
+    parent_array = np.full(size, -1, dtype=np.int32)
+    parent = memoryview(parent_array)
+    g_score = memoryview(np.full(size, -1, dtype=np.int32))
+    closed = memoryview(new_bitset(size))
+    g_score[source] = 0
+    open_list = [(heuristic(start, goal), 0, source)]  # (f_score, -g_score, node)
+    stats = {
+        "nodes_expanded": 0,
+        "path_length": 0,
+        "heap_pushes": 1,
+        "heap_pops": 0,
+        "stale_skipped": 0,
+        "re_expansions": 0,
+        "frontier_peak": 1,
+    }
+
+    while open_list:
+        _, negative_g, current = heapq.heappop(open_list)
+        stats["heap_pops"] += 1
+        if -negative_g != g_score[current]:
+            stats["stale_skipped"] += 1
+            continue
+        if closed[current >> 3] >> (current & 7) & 1:
+            stats["re_expansions"] += 1
+        closed[current >> 3] |= 1 << (current & 7)
+        stats["nodes_expanded"] += 1
+        if on_expand is not None:
+            on_expand(divmod(current, cols))
+
+        if current == target:
+            path = reconstruct_path(parent, current, cols)
+            stats["path_length"] = len(path)
+            return path, stats
+
+        tentative_g_score = g_score[current] + 1
+        for neighbor in open_neighbors(cells, current, cols, size):
+            if g_score[neighbor] == -1 or tentative_g_score < g_score[neighbor]:
+                g_score[neighbor] = tentative_g_score
+                parent[neighbor] = current
+                row, col = divmod(neighbor, cols)
+                h = abs(row - goal_row) + abs(col - goal_col)
+                heapq.heappush(open_list, (tentative_g_score + h, -tentative_g_score, neighbor))
+                stats["heap_pushes"] += 1
+        if len(open_list) > stats["frontier_peak"]:
+            stats["frontier_peak"] = len(open_list)
+
+    return None, stats
+
+
+def _jump_horizontal(cells, index, step, cols, target):
+    """Scan along a row from ``index``; returns the next jump point or -1."""
+    col = index % cols
+    size = len(cells)
+    while True:
+        col += step
+        if col < 0 or col >= cols:
+            return -1
+        index += step
+        if cells[index] == WALL:
+            return -1
+        if index == target:
+            return index
+        # A cell above/below that was walled off one step back is a forced neighbour
+        up, down = index - cols, index + cols
+        if up >= 0 and cells[up] != WALL and cells[up - step] == WALL:
+            return index
+        if down < size and cells[down] != WALL and cells[down - step] == WALL:
+            return index
+
+
+def _jump_vertical(cells, index, step, cols, target):
+    """Scan along a column from ``index``; also stops where a row scan would find something."""
+    size = len(cells)
+    col = index % cols
+    offset = step * cols
+    while True:
+        index += offset
+        if index < 0 or index >= size or cells[index] == WALL:
+            return -1
+        if index == target:
+            return index
+        if col > 0 and cells[index - 1] != WALL and cells[index - 1 - offset] == WALL:
+            return index
+        if col < cols - 1 and cells[index + 1] != WALL and cells[index + 1 - offset] == WALL:
+            return index
+        if _jump_horizontal(cells, index, 1, cols, target) != -1 or _jump_horizontal(cells, index, -1, cols, target) != -1:
+            return index
+
+
+def _expand_jumps(jump_points, cols):
+    """Fill in the straight segments between consecutive jump points."""
+    path = [jump_points[0]]
+    for row, col in jump_points[1:]:
+        last_row, last_col = path[-1]
+        row_step = (row > last_row) - (row < last_row)
+        col_step = (col > last_col) - (col < last_col)
+        while (last_row, last_col) != (row, col):
+            last_row, last_col = last_row + row_step, last_col + col_step
+            path.append((last_row, last_col))
+    return path
+
+
+def jump_point_search(grid, start, goal, on_expand=None):
+    """Jump Point Search for 4-connected grids, returning an optimal path.
+
+    Instead of pushing every neighbour, the search jumps in straight lines
+    and only stops at the goal or at cells with a forced neighbour (an open
+    side cell whose predecessor along the line was walled).  Symmetric
+    equal-cost routes across open areas therefore never enter the heap.
+    """
+    cells, cols, size = _prepare(grid)
+    source = start[0] * cols + start[1]
+    target = goal[0] * cols + goal[1]
+    goal_row, goal_col = goal
+    parent_array = np.full(size, -1, dtype=np.int32)
+    parent = memoryview(parent_array)
+    g_score = memoryview(np.full(size, -1, dtype=np.int32))
+    g_score[source] = 0
+    open_list = [(heuristic(start, goal), 0, source)]
+    stats = {
+        "nodes_expanded": 0,
+        "path_length": 0,
+        "heap_pushes": 1,
+        "heap_pops": 0,
+        "stale_skipped": 0,
+        "frontier_peak": 1,
+    }
+
+    while open_list:
+        _, negative_g, current = heapq.heappop(open_list)
+        stats["heap_pops"] += 1
+        if -negative_g != g_score[current]:
+            stats["stale_skipped"] += 1
+            continue
+        stats["nodes_expanded"] += 1
+        if on_expand is not None:
+            on_expand(divmod(current, cols))
+
+        if current == target:
+            jump_points = reconstruct_path(parent, current, cols)
+            path = _expand_jumps(jump_points, cols)
+            stats["path_length"] = len(path)
+            return path, stats
+
+        # Prune the direction we came from; scan the others
+        row, col = divmod(current, cols)
+        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        if parent[current] != -1:
+            parent_row, parent_col = divmod(parent[current], cols)
+            directions.remove(((parent_row > row) - (parent_row < row), (parent_col > col) - (parent_col < col)))
+
+        for row_step, col_step in directions:
+            if col_step:
+                jump = _jump_horizontal(cells, current, col_step, cols, target)
+            else:
+                jump = _jump_vertical(cells, current, row_step, cols, target)
+            if jump == -1:
+                continue
+            jump_row, jump_col = divmod(jump, cols)
+            tentative_g_score = g_score[current] + abs(jump_row - row) + abs(jump_col - col)
+            if g_score[jump] == -1 or tentative_g_score < g_score[jump]:
+                g_score[jump] = tentative_g_score
+                parent[jump] = current
+                h = abs(jump_row - goal_row) + abs(jump_col - goal_col)
+                heapq.heappush(open_list, (tentative_g_score + h, -tentative_g_score, jump))
+                stats["heap_pushes"] += 1
+        if len(open_list) > stats["frontier_peak"]:
+            stats["frontier_peak"] = len(open_list)
+
+    return None, stats
+
+
+def _join_paths(forward_parent, backward_parent, meet, cols):
+    path = reconstruct_path(forward_parent, meet, cols)
+    current = backward_parent[meet]
+    while current != -1:
+        path.append(divmod(current, cols))
+        current = backward_parent[current]
+    return path
+
+
+def bidirectional_bfs(grid, start, goal, on_expand=None):
+    """BFS from both the start and the goal, meeting in the middle.
+
+    Whole layers are expanded from the smaller frontier; once a layer
+    touches the other search the best meeting cell of that layer gives a
+    shortest path.
+    """
+    cells, cols, size = _prepare(grid)
+    source = start[0] * cols + start[1]
+    target = goal[0] * cols + goal[1]
+    stats = {"nodes_expanded": 0, "path_length": 0}
+    parents = [memoryview(np.full(size, -1, dtype=np.int32)) for _ in range(2)]
+    dists = [memoryview(np.full(size, -1, dtype=np.int32)) for _ in range(2)]
+    dists[0][source] = 0
+    dists[1][target] = 0
+    frontiers = [[source], [target]]
+    meet = source if source == target else -1
+
+    while meet == -1 and frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        parent, dist, other_dist = parents[side], dists[side], dists[1 - side]
+        best = -1
+        next_frontier = []
+        for current in frontiers[side]:
+            stats["nodes_expanded"] += 1
+            if on_expand is not None:
+                on_expand(divmod(current, cols))
+            for neighbor in open_neighbors(cells, current, cols, size):
+                if dist[neighbor] == -1:
+                    dist[neighbor] = dist[current] + 1
+                    parent[neighbor] = current
+                    next_frontier.append(neighbor)
+                    if other_dist[neighbor] != -1:
+                        total = dist[neighbor] + other_dist[neighbor]
+                        if best == -1 or total < best:
+                            best, meet = total, neighbor
+        frontiers[side] = next_frontier
+
+    if meet == -1:
+        return None, stats
+    path = _join_paths(parents[0], parents[1], meet, cols)
+    stats["path_length"] = len(path)
+    return path, stats
+
+
+def bidirectional_a_star(grid, start, goal, on_expand=None):
+    """A* from both ends with balanced potentials and lazy deletion.
+
+    Each side uses the averaged potential ``p(v) = (h_goal(v) - h_start(v)) / 2``
+    (negated for the backward search), so both searches see the same
+    reduced edge costs and meet near the middle instead of each running
+    most of the way across.  Each step expands the side with the smaller
+    open list; keys are kept doubled to stay integral.  ``p`` changes by at
+    most one per step, so once the two smallest keys add up to twice the
+    best meeting cost found, no shorter path is left.
+
+    It pays off on mazes with loops (about half of A*'s expansions);
+    on perfect mazes, where the single route leaves no shortcut to find,
+    it expands about as many nodes as A*.
+    """
+    cells, cols, size = _prepare(grid)
+    ends = [start, goal]
+    sources = [start[0] * cols + start[1], goal[0] * cols + goal[1]]
+    parents = [memoryview(np.full(size, -1, dtype=np.int32)) for _ in range(2)]
+    g_scores = [memoryview(np.full(size, -1, dtype=np.int32)) for _ in range(2)]
+    open_lists = []
+    for side in (0, 1):
+        g_scores[side][sources[side]] = 0
+        # doubled potential of the source: h to the far end minus h to itself (0)
+        open_lists.append([(heuristic(ends[side], ends[1 - side]), 0, sources[side])])
+    stats = {"nodes_expanded": 0, "path_length": 0, "heap_pushes": 2, "heap_pops": 0, "stale_skipped": 0}
+    best, meet = (0, sources[0]) if sources[0] == sources[1] else (-1, -1)
+
+    while open_lists[0] and open_lists[1]:
+        if best != -1 and open_lists[0][0][0] + open_lists[1][0][0] >= 2 * best:
+            break
+        side = 0 if len(open_lists[0]) <= len(open_lists[1]) else 1
+        open_list, parent = open_lists[side], parents[side]
+        g_score, other_g = g_scores[side], g_scores[1 - side]
+        (own_row, own_col), (target_row, target_col) = ends[side], ends[1 - side]
+
+        _, negative_g, current = heapq.heappop(open_list)
+        stats["heap_pops"] += 1
+        if -negative_g != g_score[current]:
+            stats["stale_skipped"] += 1
+            continue
+        row, col = divmod(current, cols)
+        if best != -1 and -negative_g + abs(row - target_row) + abs(col - target_col) >= best:
+            continue  # plain A* bound: cannot lead to a shorter meeting
+        stats["nodes_expanded"] += 1
+        if on_expand is not None:
+            on_expand((row, col))
+
+        tentative_g_score = g_score[current] + 1
+        for neighbor in open_neighbors(cells, current, cols, size):
+            if g_score[neighbor] == -1 or tentative_g_score < g_score[neighbor]:
+                g_score[neighbor] = tentative_g_score
+                parent[neighbor] = current
+                row, col = divmod(neighbor, cols)
+                potential = abs(row - target_row) + abs(col - target_col) - abs(row - own_row) - abs(col - own_col)
+                heapq.heappush(open_list, (2 * tentative_g_score + potential, -tentative_g_score, neighbor))
+                stats["heap_pushes"] += 1
+                if other_g[neighbor] != -1 and (best == -1 or tentative_g_score + other_g[neighbor] < best):
+                    best, meet = tentative_g_score + other_g[neighbor], neighbor
+
+    if meet == -1:
+        return None, stats
+    path = _join_paths(parents[0], parents[1], meet, cols)
+    stats["path_length"] = len(path)
+    return path, stats
+
+
+def _cost_layer(costs, rows, cols):
+    """Flat per-cell entry costs (all 1 when ``costs`` is None) with their min and max."""
+    if costs is None:
+        return memoryview(np.ones(rows * cols, dtype=np.uint8)), 1, 1
+    costs = np.ascontiguousarray(costs, dtype=np.uint8)
+    if costs.shape != (rows, cols):
+        raise ValueError(f"cost layer is {costs.shape}, maze is {(rows, cols)}")
+    if not costs.size:
+        return memoryview(costs.reshape(-1)), 1, 1
+    if costs.min() < 1:
+        raise ValueError("cell costs must be at least 1")
+    return memoryview(costs.reshape(-1)), int(costs.min()), int(costs.max())
+
+
+def dijkstra(grid, start, goal, on_expand=None, costs=None):
+    """Cheapest path when entering a cell costs ``costs[cell]`` (1 to 255).
+
+    Distances are integers and a step adds at most 255, so the queue is a
+    ring of ``max_cost + 1`` buckets (Dial's algorithm): every pending
+    distance lies within ``max_cost`` of the one being expanded, so bucket
+    ``d % len(buckets)`` only ever holds cells at distance ``d``.  Push and
+    pop are O(1) instead of a heap's O(log n).
+    """
+    grid = as_grid(grid)
+    rows, cols = grid.shape
+    cells, size = memoryview(grid.reshape(-1)), rows * cols
+    cost, _, max_cost = _cost_layer(costs, rows, cols)
+    source = start[0] * cols + start[1]
+    target = goal[0] * cols + goal[1]
+    parent_array = np.full(size, -1, dtype=np.int32)
+    parent = memoryview(parent_array)
+    dist = memoryview(np.full(size, -1, dtype=np.int64))
+    closed = memoryview(new_bitset(size))
+    ring = max_cost + 1
+    buckets = [[] for _ in range(ring)]
+    buckets[0].append(source)
+    dist[source] = 0
+    pending, current_distance = 1, 0
+    stats = {"nodes_expanded": 0, "path_length": 0, "path_cost": None, "frontier_pushes": 1, "stale_skipped": 0}
+
+    while pending:
+        bucket = buckets[current_distance % ring]
+        if not bucket:
+            current_distance += 1
+            continue
+        current = bucket.pop()
+        pending -= 1
+        if dist[current] != current_distance or closed[current >> 3] >> (current & 7) & 1:
+            stats["stale_skipped"] += 1
+            continue
+        closed[current >> 3] |= 1 << (current & 7)
+        stats["nodes_expanded"] += 1
+        if on_expand is not None:
+            on_expand(divmod(current, cols))
+
+        if current == target:
+            path = reconstruct_path(parent, current, cols)
+            stats["path_length"] = len(path)
+            stats["path_cost"] = current_distance
+            return path, stats
+
+        for neighbor in open_neighbors(cells, current, cols, size):
+            tentative = current_distance + cost[neighbor]
+            if dist[neighbor] == -1 or tentative < dist[neighbor]:
+                dist[neighbor] = tentative
+                parent[neighbor] = current
+                buckets[tentative % ring].append(neighbor)
+                pending += 1
+                stats["frontier_pushes"] += 1
+
+    return None, stats
+
+
+def a_star_weighted(grid, start, goal, on_expand=None, costs=None):
+    """A* over per-cell entry costs; the Manhattan heuristic is scaled by the cheapest cell."""
+    grid = as_grid(grid)
+    rows, cols = grid.shape
+    cells, size = memoryview(grid.reshape(-1)), rows * cols
+    cost, min_cost, _ = _cost_layer(costs, rows, cols)
+    source = start[0] * cols + start[1]
+    target = goal[0] * cols + goal[1]
+    goal_row, goal_col = goal
+    parent_array = np.full(size, -1, dtype=np.int32)
+    parent = memoryview(parent_array)
+    g_score = memoryview(np.full(size, -1, dtype=np.int64))
+    g_score[source] = 0
+    open_list = [(heuristic(start, goal) * min_cost, 0, source)]  # (f_score, -g_score, node)
+    stats = {
+        "nodes_expanded": 0,
+        "path_length": 0,
+        "path_cost": None,
+        "heap_pushes": 1,
+        "heap_pops": 0,
+        "stale_skipped": 0,
+    }
+
+    while open_list:
+        _, negative_g, current = heapq.heappop(open_list)
+        stats["heap_pops"] += 1
+        if -negative_g != g_score[current]:
+            stats["stale_skipped"] += 1
+            continue
+        stats["nodes_expanded"] += 1
+        if on_expand is not None:
+            on_expand(divmod(current, cols))
+
+        if current == target:
+            path = reconstruct_path(parent, current, cols)
+            stats["path_length"] = len(path)
+            stats["path_cost"] = g_score[current]
+            return path, stats
+
+        for neighbor in open_neighbors(cells, current, cols, size):
+            tentative_g_score = g_score[current] + cost[neighbor]
+            if g_score[neighbor] == -1 or tentative_g_score < g_score[neighbor]:
+                g_score[neighbor] = tentative_g_score
+                parent[neighbor] = current
+                row, col = divmod(neighbor, cols)
+                h = (abs(row - goal_row) + abs(col - goal_col)) * min_cost
+                heapq.heappush(open_list, (tentative_g_score + h, -tentative_g_score, neighbor))
+                stats["heap_pushes"] += 1
+
+    return None, stats
+
+
+SOLVERS = {
+    "bfs": bfs,
+    "bfs_vectorized": bfs_vectorized,
+    "dfs": dfs,
+    "aStar": a_star,
+    "jps": jump_point_search,
+    "bfs_bidirectional": bidirectional_bfs,
+    "aStar_bidirectional": bidirectional_a_star,
+    "dijkstra": dijkstra,
+    "aStar_weighted": a_star_weighted,
+}
+
+WEIGHTED_SOLVERS = ("dijkstra", "aStar_weighted")  # the solvers that take a ``costs`` layer
+
+
+def solve(grid, algorithm="bfs", on_expand=None, costs=None):
+    """Solve a maze headlessly using the start (2) and goal (3) cells in the grid.
+
+    ``costs`` (per-cell entry costs) is used by the weighted solvers and
+    ignored by the unit-cost ones.
+    """
+    grid = as_grid(grid)
+    start, goal = find_start_goal(grid)
+    if not start or not goal:
+        raise ValueError("Start or goal not found in the grid!")
+    if algorithm in WEIGHTED_SOLVERS:
+        return SOLVERS[algorithm](grid, start, goal, on_expand=on_expand, costs=costs)
+    return SOLVERS[algorithm](grid, start, goal, on_expand=on_expand)